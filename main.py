@@ -15,6 +15,11 @@ if __name__ == '__main__':
     
     # 在应用启动前加载依赖描述缓存
     dependency.load_descriptions()
-    
-    # 启动Flask应用，绑定到127.0.0.1:8282
-    api.app.run(host='127.0.0.1', port=8282, debug=False)
+
+    # 优先使用waitress生产级WSGI服务器（多线程，长轮询/SSE请求不会阻塞其他请求）
+    try:
+        from waitress import serve
+        serve(api.app, host='127.0.0.1', port=8282, threads=16)
+    except ImportError:
+        core.print_status("未安装waitress，回退到Flask内置服务器", 'warning')
+        api.app.run(host='127.0.0.1', port=8282, debug=False, threaded=True)
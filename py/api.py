@@ -1,807 +1,1226 @@
-"""
-API模块 - 处理Web API路由和请求响应
-
-此模块提供:
-- Flask应用和路由定义
-- API端点实现
-- 请求处理和响应格式化
-- 文件上传管理
-"""
-
-import os
-import sys
-import json
-import time
-import tempfile
-import shutil
-import uuid
-import threading
-from flask import Flask, jsonify, request, send_from_directory, Response
-from flask_cors import CORS
-import logging
-
-# 导入自定义模块
-from . import core
-from . import dependency
-
-# 创建Flask应用实例
-app = Flask(__name__, static_folder='..')
-CORS(app)  # 启用跨域请求支持
-
-# 自定义日志配置 - 减少冗余日志输出
-class RequestFilter(logging.Filter):
-    def filter(self, record):
-        # 过滤掉检查描述更新的请求日志
-        return 'GET /api/check-description-updates' not in record.getMessage()
-
-# 应用日志过滤器
-logging.getLogger('werkzeug').addFilter(RequestFilter())
-# 设置日志级别为WARNING，减少不必要的INFO日志
-logging.getLogger('werkzeug').setLevel(logging.WARNING)
-
-# 通用API响应格式化
-def api_response(success, message=None, data=None, status_code=200):
-    """
-    格式化API响应
-    
-    Args:
-        success (bool): 操作是否成功
-        message (str, optional): 响应消息
-        data (dict, optional): 响应数据
-        status_code (int): HTTP状态码
-    
-    Returns:
-        tuple: (Flask JSON响应, 状态码)
-    """
-    response = {"success": success}
-    if message:
-        response["message"] = message
-    if data:
-        response.update(data)
-    return jsonify(response), status_code
-
-# 根路由 - 提供静态文件
-@app.route('/')
-def index():
-    """提供主页HTML"""
-    return send_from_directory('..', 'index.html')
-
-@app.route('/<path:path>')
-def serve_static(path):
-    """提供静态文件"""
-    return send_from_directory('..', path)
-
-# 获取依赖列表
-@app.route('/api/dependencies')
-def get_dependencies():
-    """获取所有已安装的依赖信息"""
-    try:
-        # 检查是否使用缓存
-        use_cache = request.args.get('useCache', 'false').lower() == 'true'
-        
-        # 获取依赖列表
-        dependencies = dependency.get_all_dependencies(use_cache)
-        
-        return jsonify(dependencies)
-    except Exception as e:
-        core.print_status(f"获取依赖列表时出错: {e}", 'error')
-        return api_response(False, f"获取依赖列表失败: {str(e)}", status_code=500)
-
-# 获取依赖当前版本
-@app.route('/api/dependency-current-version/<dependency_name>')
-def get_dependency_current_version(dependency_name):
-    """获取特定依赖的当前版本信息"""
-    try:
-        # 获取依赖信息
-        dep_info = dependency.get_single_dependency(dependency_name)
-        if dep_info:
-            return api_response(True, "获取成功", {"version": dep_info['version']})
-        else:
-            return api_response(False, f"找不到依赖: {dependency_name}", status_code=404)
-    except Exception as e:
-        core.print_status(f"获取依赖版本信息时出错: {e}", 'error')
-        return api_response(False, f"获取依赖版本信息失败: {str(e)}", status_code=500)
-
-# 检查依赖描述更新
-@app.route('/api/check-description-updates')
-def check_description_updates():
-    """检查是否有新的依赖描述信息"""
-    # 获取前端上次更新的时间戳
-    last_update = float(request.args.get('lastUpdate', 0))
-    # 检查是否为环境变更请求
-    environment_changed = request.args.get('environmentChanged', 'false').lower() == 'true'
-    current_time = time.time()
-    
-    # 检查是否为首次UI加载后的请求（时间戳接近于0表示首次请求）
-    if last_update < 1:
-        # UI首次加载完成，触发只更新缺失描述的操作
-        threading.Thread(
-            target=dependency.async_update_descriptions,
-            kwargs={'only_missing': True},
-            daemon=True
-        ).start()
-        core.print_status("UI加载完成，开始后台更新缺失的依赖描述", 'info')
-    # 环境变更请求，只更新缺失的依赖描述
-    elif environment_changed:
-        # 环境已变更，触发更新所有依赖描述
-        threading.Thread(
-            target=dependency.async_update_descriptions,
-            kwargs={'only_missing': True},  # 改为只更新缺失的依赖描述
-            daemon=True
-        ).start()
-        core.print_status("Python环境已切换，开始更新所有的依赖描述", 'info')
-        # 强制标记有更新
-        if hasattr(dependency, 'last_description_update'):
-            dependency.last_description_update = current_time
-    
-    # 检查是否有更新
-    has_updates = False
-    if current_time - last_update < 10 and hasattr(dependency, 'last_description_update'):
-        if dependency.last_description_update > last_update:
-            has_updates = True
-    
-    return jsonify({'hasUpdates': has_updates})
-
-# 批量卸载依赖
-@app.route('/api/batch-uninstall', methods=['POST'])
-def batch_uninstall():
-    """批量卸载多个依赖"""
-    data = request.json
-    packages = data.get('packages', [])
-    
-    if not packages:
-        return api_response(False, '没有选择要卸载的依赖', status_code=400)
-    
-    # 创建任务
-    task_id = core.create_task('卸载', packages)
-    
-    # 启动后台任务执行批量卸载
-    threading.Thread(
-        target=dependency.batch_uninstall,
-        args=(packages, task_id),
-        daemon=True
-    ).start()
-    
-    return api_response(True, f'正在卸载 {len(packages)} 个依赖', {'taskId': task_id})
-
-# 安装依赖
-@app.route('/api/install', methods=['POST'])
-def install_dependency_route():
-    """安装依赖"""
-    data = request.json
-    package_name = data.get('packageName', '')
-    
-    if not package_name:
-        return api_response(False, '包名称不能为空', status_code=400)
-    
-    # 执行安装
-    success, message = dependency.install_dependency(package_name)
-    
-    if success:
-        return api_response(True, message)
-    else:
-        return api_response(False, message, status_code=400)
-
-# 卸载依赖
-@app.route('/api/uninstall', methods=['POST'])
-def uninstall_dependency_route():
-    """卸载依赖"""
-    data = request.json
-    package_name = data.get('dependency', '')
-    
-    if not package_name:
-        return api_response(False, '依赖名称不能为空', status_code=400)
-    
-    # 执行卸载
-    success, message = dependency.uninstall_dependency(package_name)
-    
-    if success:
-        return api_response(True, message)
-    else:
-        return api_response(False, message, status_code=400)
-
-# 更新依赖
-@app.route('/api/update', methods=['POST'])
-def update_dependency_route():
-    """更新依赖到最新版本"""
-    data = request.json
-    package_name = data.get('dependency', '')
-    
-    if not package_name:
-        return api_response(False, '依赖名称不能为空', status_code=400)
-    
-    # 创建任务
-    task_id = core.create_task('更新', [package_name])
-    
-    # 启动后台任务执行更新
-    threading.Thread(
-        target=lambda: dependency.update_dependency(package_name, task_id),
-        daemon=True
-    ).start()
-    
-    return api_response(True, f'正在更新: {package_name}', {'taskId': task_id})
-
-# 切换依赖版本
-@app.route('/api/switch-version', methods=['POST'])
-def switch_version_route():
-    """切换依赖版本"""
-    data = request.json
-    package_name = data.get('dependency', '')
-    version = data.get('version', '')
-    
-    if not package_name or not version:
-        return api_response(False, '依赖名称和版本不能为空', status_code=400)
-    
-    # 创建任务
-    task_id = core.create_task('切换版本', [f"{package_name}=={version}"])
-    
-    # 启动后台任务执行版本切换
-    threading.Thread(
-        target=lambda: dependency.switch_version(package_name, version, task_id),
-        daemon=True
-    ).start()
-    
-    return api_response(True, f'正在将 {package_name} 切换到版本 {version}', {'taskId': task_id})
-
-# 更新所选依赖
-@app.route('/api/update-selected', methods=['POST'])
-def update_selected_route():
-    """更新所选依赖"""
-    data = request.json
-    packages = data.get('packages', [])
-    
-    if not packages:
-        return api_response(False, '没有选择要更新的依赖', status_code=400)
-    
-    # 创建任务
-    task_id = core.create_task('更新', packages)
-    
-    # 启动后台任务执行批量更新
-    threading.Thread(
-        target=dependency.batch_update,
-        args=(packages, task_id),
-        daemon=True
-    ).start()
-    
-    return api_response(True, f'正在更新 {len(packages)} 个依赖', {'taskId': task_id})
-
-# 安装wheel文件
-@app.route('/api/install-whl', methods=['POST'])
-def install_whl_route():
-    """安装wheel文件"""
-    if 'file' not in request.files:
-        return api_response(False, '没有上传文件', status_code=400)
-    
-    file = request.files['file']
-    if file.filename == '':
-        return api_response(False, '没有选择文件', status_code=400)
-    
-    if not file.filename.endswith('.whl'):
-        return api_response(False, '只支持.whl文件', status_code=400)
-    
-    try:
-        # 创建临时文件
-        temp_dir = tempfile.mkdtemp()
-        temp_file_path = os.path.join(temp_dir, file.filename)
-        
-        # 保存上传的文件
-        file.save(temp_file_path)
-        
-        # 创建任务ID用于跟踪进度
-        task_id = core.create_task('安装WHL', [file.filename])
-        
-        # 使用线程启动安装过程，实现异步操作
-        def process_whl_install():
-            try:
-                result = dependency.install_whl(temp_file_path, task_id)
-                if not result:
-                    core.complete_task(task_id, [f"安装失败: {file.filename}"])
-            finally:
-                # 确保临时目录被清理
-                if os.path.exists(temp_dir):
-                    shutil.rmtree(temp_dir, ignore_errors=True)
-        
-        # 启动后台任务
-        threading.Thread(target=process_whl_install, daemon=True).start()
-        
-        return api_response(True, f'正在安装 {file.filename}，请等待...', {'taskId': task_id})
-    except Exception as e:
-        # 确保清理临时文件
-        if 'temp_dir' in locals():
-            shutil.rmtree(temp_dir, ignore_errors=True)
-        core.print_status(f"处理wheel安装请求时出错: {str(e)}", 'error')
-        return api_response(False, f'安装失败: {str(e)}', status_code=400)
-
-# 安装requirements.txt文件
-@app.route('/api/install-requirements', methods=['POST'])
-def install_requirements_route():
-    """安装requirements.txt文件"""
-    if 'file' not in request.files:
-        return api_response(False, '没有上传文件', status_code=400)
-    
-    file = request.files['file']
-    if file.filename == '':
-        return api_response(False, '没有选择文件', status_code=400)
-    
-    if not file.filename.endswith('.txt'):
-        return api_response(False, '只支持.txt文件', status_code=400)
-    
-    try:
-        # 创建临时文件
-        temp_dir = tempfile.mkdtemp()
-        temp_file_path = os.path.join(temp_dir, 'requirements.txt')
-        
-        # 保存上传的文件
-        file.save(temp_file_path)
-        
-        # 创建任务ID
-        task_id = core.create_task('安装', ['从requirements.txt安装'])
-        
-        # 后台处理函数
-        def process_requirements_install():
-            try:
-                result = dependency.install_requirements(temp_file_path, task_id)
-                if not result:
-                    core.complete_task(task_id, [f"安装失败: {file.filename}"])
-            finally:
-                # 确保临时目录被清理
-                if os.path.exists(temp_dir):
-                    shutil.rmtree(temp_dir, ignore_errors=True)
-        
-        # 启动后台任务
-        threading.Thread(target=process_requirements_install, daemon=True).start()
-        
-        return api_response(True, '正在安装packages，请等待...', {'taskId': task_id})
-    except Exception as e:
-        # 确保清理临时文件
-        if 'temp_dir' in locals():
-            shutil.rmtree(temp_dir, ignore_errors=True)
-        return api_response(False, f'安装失败: {str(e)}', status_code=500)
-
-# 获取任务进度
-@app.route('/api/task-progress/<task_id>')
-def get_task_progress(task_id):
-    """获取任务进度"""
-    if task_id not in core.task_progress:
-        return api_response(False, '任务不存在', status_code=404)
-    
-    return jsonify(core.task_progress[task_id])
-
-# 清理PIP缓存
-@app.route('/api/clean-pip-cache', methods=['POST'])
-def clean_pip_cache_route():
-    """清理pip缓存"""
-    # 创建任务
-    task_id = core.create_task('清理缓存', ['pip cache'])
-    
-    # 启动后台任务执行缓存清理
-    threading.Thread(
-        target=lambda: dependency.clean_pip_cache(task_id),
-        daemon=True
-    ).start()
-    
-    return api_response(True, '正在清理PIP缓存', {'taskId': task_id})
-
-# 检查所有依赖的最新版本
-@app.route('/api/check-versions', methods=['POST'])
-def check_all_versions():
-    """检查所有依赖的最新版本 - 返回SSE流以报告进度"""
-    def generate():
-        try:
-            # 获取已安装的依赖列表
-            all_deps = dependency.get_all_dependencies(use_cache=True)
-            
-            # 筛选需要检查的包 - 排除系统依赖和软件依赖
-            packages_to_check = [
-                dep for dep in all_deps 
-                if not dep['isSystem'] and not dep['isAppRequired']
-            ]
-            
-            # 计算检查的总数量
-            total = len(packages_to_check)
-            core.print_status(f"需要检查 {total} 个依赖的版本信息", 'info')
-            
-            # 发送初始进度
-            yield json.dumps({"progress": 0}) + "\n"
-            
-            # 启动异步更新
-            threading.Thread(
-                target=dependency.async_update_descriptions_and_versions,
-                daemon=True
-            ).start()
-            
-            # 模拟进度报告 - 由于实际进度无法精确测量，我们使用模拟的进度报告
-            progress_steps = [10, 25, 40, 60, 75, 90, 100]
-            for progress in progress_steps:
-                time.sleep(0.5)  # 添加短暂延迟以模拟处理时间
-                yield json.dumps({"progress": progress}) + "\n"
-                if progress == 100:
-                    break
-            
-        except Exception as e:
-            core.print_status(f"检查版本过程出错: {e}", 'error')
-            yield json.dumps({"error": str(e)}) + "\n"
-    
-    return Response(generate(), mimetype='text/event-stream')
-
-# 获取系统信息
-@app.route('/api/system-info')
-def get_system_info():
-    """获取Python和pip版本信息"""
-    try:
-        import subprocess
-        
-        # 获取Python版本
-        python_version = sys.version.split()[0]
-        
-        # 获取pip版本
-        pip_version_process = subprocess.run(
-            [sys.executable, '-m', 'pip', '--version'], 
-            capture_output=True, 
-            text=True
-        )
-        pip_version = pip_version_process.stdout.split()[1] if pip_version_process.returncode == 0 else "未知"
-        
-        return jsonify({
-            'pythonVersion': python_version,
-            'pipVersion': pip_version
-        })
-    except Exception as e:
-        core.print_status(f"获取系统信息失败: {e}", 'error')
-        return jsonify({
-            'pythonVersion': '未知',
-            'pipVersion': '未知'
-        }), 500
-
-# 获取缓存信息
-@app.route('/api/cache-info')
-def get_cache_info():
-    """获取缓存信息，包括最后更新时间"""
-    try:
-        cache_info = core.get_cache_info()
-        return jsonify(cache_info)
-    except Exception as e:
-        core.print_status(f"获取缓存信息失败: {e}", 'error')
-        return api_response(False, f"获取缓存信息失败: {str(e)}", status_code=500)
-
-# 获取依赖分类
-@app.route('/api/dependency-categories')
-def get_dependency_categories():
-    """获取依赖分类信息"""
-    try:
-        return jsonify(core.dependency_config)
-    except Exception as e:
-        core.print_status(f"获取依赖分类信息失败: {e}", 'error')
-        return api_response(False, f"获取依赖分类信息失败: {str(e)}", status_code=500)
-
-# 获取依赖关系图数据
-@app.route('/api/dependency-graph/<package_name>')
-def get_dependency_graph(package_name):
-    """获取指定包的依赖关系图数据"""
-    try:
-        # 获取查询参数
-        max_depth = request.args.get('depth', default=2, type=int)  # 默认深度为2层
-        include_dev = request.args.get('dev', default='false', type=str).lower() == 'true'
-        
-        # 限制最大深度以避免过大的响应
-        if max_depth > 4:
-            max_depth = 4
-        
-        # 调用依赖模块获取依赖关系图数据
-        graph_data = dependency.get_dependency_graph(package_name, max_depth, include_dev)
-        
-        # 返回图数据
-        return api_response(True, data=graph_data)
-        
-    except Exception as e:
-        app.logger.error(f"获取依赖关系图失败: {str(e)}", exc_info=True)
-        return api_response(False, f"获取依赖关系图失败: {str(e)}", status_code=500)
-
-# 导入新增模块
-import subprocess
-import platform
-import os.path
-
-# 获取所有Python环境
-@app.route('/api/python-environments')
-def get_python_environments():
-    """获取所有已配置的Python环境"""
-    try:
-        environments = core.load_python_environments()
-        
-        # 如果是首次运行且没有环境，尝试添加当前环境
-        if not environments.get("environments") and environments.get("current") is None:
-            current_env = {
-                "id": "system",
-                "name": "当前Python环境",
-                "path": sys.executable,
-                "type": "system",
-                "version": sys.version.split()[0]
-            }
-            environments["environments"] = [current_env]
-            environments["current"] = "system"
-            core.save_python_environments(environments)
-        
-        return jsonify(environments)
-    except Exception as e:
-        core.print_status(f"获取Python环境列表失败: {e}", 'error')
-        return api_response(False, f"获取Python环境列表失败: {str(e)}", status_code=500)
-
-# 保存Python环境
-@app.route('/api/python-environments', methods=['POST'])
-def save_python_environment():
-    """新增或修改Python环境"""
-    try:
-        data = request.json
-        
-        # 加载现有环境
-        environments = core.load_python_environments()
-        
-        # 生成唯一ID
-        import uuid
-        env_id = data.get("id") or str(uuid.uuid4())
-        
-        # 验证环境路径
-        python_path = data.get("path", "")
-        if not python_path or not os.path.exists(python_path):
-            return api_response(False, "Python可执行文件路径无效", status_code=400)
-        
-        # 获取Python版本
-        try:
-            version_process = subprocess.run(
-                [python_path, "--version"], 
-                capture_output=True, 
-                text=True,
-                check=True
-            )
-            version = version_process.stdout.strip() or version_process.stderr.strip()
-            version = version.replace("Python ", "")
-        except Exception as e:
-            return api_response(False, f"无法获取Python版本: {str(e)}", status_code=400)
-        
-        # 创建或更新环境
-        new_env = {
-            "id": env_id,
-            "name": data.get("name", f"Python {version}"),
-            "path": python_path,
-            "type": data.get("type", "custom"),
-            "version": version
-        }
-        
-        # 更新或添加环境
-        updated = False
-        for i, env in enumerate(environments["environments"]):
-            if env["id"] == env_id:
-                environments["environments"][i] = new_env
-                updated = True
-                break
-        
-        if not updated:
-            environments["environments"].append(new_env)
-        
-        # 保存更新
-        if not core.save_python_environments(environments):
-            return api_response(False, "保存环境配置失败", status_code=500)
-        
-        return api_response(True, "环境已保存", {"environment": new_env})
-        
-    except Exception as e:
-        core.print_status(f"保存Python环境失败: {e}", 'error')
-        return api_response(False, f"保存Python环境失败: {str(e)}", status_code=500)
-
-# 删除Python环境
-@app.route('/api/python-environments/<env_id>', methods=['DELETE'])
-def delete_python_environment(env_id):
-    """删除Python环境"""
-    try:
-        # 加载现有环境
-        environments = core.load_python_environments()
-        
-        # 检查是否是当前环境
-        if environments.get("current") == env_id:
-            return api_response(False, "不能删除当前使用的环境", status_code=400)
-        
-        # 查找和删除环境
-        found = False
-        for i, env in enumerate(environments["environments"]):
-            if env["id"] == env_id:
-                del environments["environments"][i]
-                found = True
-                break
-        
-        if not found:
-            return api_response(False, "环境不存在", status_code=404)
-        
-        # 保存更新
-        if not core.save_python_environments(environments):
-            return api_response(False, "保存环境配置失败", status_code=500)
-        
-        return api_response(True, "环境已删除")
-        
-    except Exception as e:
-        core.print_status(f"删除Python环境失败: {e}", 'error')
-        return api_response(False, f"删除Python环境失败: {str(e)}", status_code=500)
-
-# 修改切换环境API
-@app.route('/api/switch-environment', methods=['POST'])
-def switch_environment():
-    """切换到指定的Python环境"""
-    try:
-        data = request.json
-        env_id = data.get("environmentId")
-        
-        if not env_id:
-            return api_response(False, "环境ID不能为空", status_code=400)
-        
-        # 加载环境配置
-        environments = core.load_python_environments()
-        
-        # 查找目标环境
-        target_env = None
-        for env in environments["environments"]:
-            if env["id"] == env_id:
-                target_env = env
-                break
-        
-        if not target_env:
-            return api_response(False, "目标环境不存在", status_code=404)
-        
-        # 检查环境可执行文件是否存在
-        python_path = target_env["path"]
-        if not os.path.exists(python_path):
-            return api_response(False, "Python可执行文件路径无效", status_code=400)
-            
-        # 检查是否是当前环境
-        current_env_id = environments.get("current")
-        if current_env_id == env_id:
-            return api_response(True, "已经是当前环境", {"environment": target_env, "needsRefresh": False})
-            
-        # 更新当前环境
-        environments["current"] = env_id
-        if not core.save_python_environments(environments):
-            return api_response(False, "保存环境配置失败", status_code=500)
-            
-        # 返回成功信息，无需重启应用
-        return api_response(True, "环境切换成功", {
-            "requiresRestart": False, 
-            "needsRefresh": True,
-            "environment": target_env
-        })
-        
-    except Exception as e:
-        core.print_status(f"切换Python环境失败: {e}", 'error')
-        return api_response(False, f"切换Python环境失败: {str(e)}", status_code=500)
-
-# 浏览Python环境
-@app.route('/api/browse-python-env', methods=['POST'])
-def browse_python_env():
-    """浏览并查找Python环境"""
-    try:
-        # 根据操作系统，搜索常见的Python安装位置
-        os_type = platform.system().lower()
-        potential_paths = []
-        
-        if os_type == 'windows':
-            # 检查常见Windows Python安装位置
-            drives = ['C:', 'D:', 'E:', 'F:']
-            for drive in drives:
-                # 搜索标准Python安装
-                potential_paths.extend([
-                    os.path.join(drive, r'Python*\python.exe'),
-                    os.path.join(drive, r'Program Files\Python*\python.exe'),
-                    os.path.join(drive, r'Program Files (x86)\Python*\python.exe'),
-                    os.path.join(drive, r'Users\*\AppData\Local\Programs\Python\Python*\python.exe'),
-                    os.path.join(drive, r'ProgramData\Anaconda*\python.exe'),
-                    os.path.join(drive, r'Users\*\anaconda*\python.exe'),
-                    os.path.join(drive, r'Users\*\miniconda*\python.exe'),
-                    os.path.join(drive, r'Users\*\Anaconda*\python.exe'),
-                    os.path.join(drive, r'Users\*\Miniconda*\python.exe'),
-                ])
-                # 搜索虚拟环境
-                potential_paths.extend([
-                    os.path.join(drive, r'Users\*\*env*\Scripts\python.exe'),
-                    os.path.join(drive, r'*env*\Scripts\python.exe'),
-                ])
-        elif os_type in ['linux', 'darwin']:  # Linux or macOS
-            # 检查常见Unix-like系统Python位置
-            potential_paths.extend([
-                '/usr/bin/python*',
-                '/usr/local/bin/python*',
-                '/opt/anaconda*/bin/python',
-                '/opt/miniconda*/bin/python',
-                os.path.expanduser('~/anaconda*/bin/python'),
-                os.path.expanduser('~/miniconda*/bin/python'),
-                os.path.expanduser('~/.virtualenvs/*/bin/python'),
-                os.path.expanduser('~/venv*/bin/python'),
-                os.path.expanduser('~/*env*/bin/python'),
-            ])
-        
-        # 执行搜索并验证找到的Python路径
-        found_environments = []
-        
-        for pattern in potential_paths:
-            try:
-                import glob
-                paths = glob.glob(pattern)
-                
-                for path in paths:
-                    if os.path.isfile(path) and os.access(path, os.X_OK):
-                        try:
-                            # 验证是否是有效的Python可执行文件
-                            version_process = subprocess.run(
-                                [path, "--version"], 
-                                capture_output=True, 
-                                text=True,
-                                timeout=2  # 设置超时避免挂起
-                            )
-                            if version_process.returncode == 0:
-                                version_output = version_process.stdout.strip() or version_process.stderr.strip()
-                                if "Python" in version_output:
-                                    version = version_output.replace("Python ", "").strip()
-                                    
-                                    # 生成环境名称
-                                    dirs = path.split(os.sep)
-                                    env_name = f"Python {version}"
-                                    
-                                    # 尝试从路径推断更好的名称
-                                    for i in range(len(dirs)-2, 0, -1):
-                                        if "env" in dirs[i].lower() or "conda" in dirs[i].lower() or "python" in dirs[i].lower():
-                                            env_name = f"{dirs[i]} ({version})"
-                                            break
-                                    
-                                    # 确定环境类型
-                                    env_type = "system"
-                                    if "virtualenv" in path.lower() or "venv" in path.lower():
-                                        env_type = "virtualenv"
-                                    elif "conda" in path.lower():
-                                        env_type = "conda"
-                                    elif "portable" in path.lower():
-                                        env_type = "portable"
-                                    
-                                    # 添加到找到的环境列表
-                                    found_environments.append({
-                                        "path": path,
-                                        "version": version,
-                                        "name": env_name,
-                                        "type": env_type
-                                    })
-                        except Exception as e:
-                            print(f"验证Python路径 {path} 时出错: {str(e)}")
-            except Exception as e:
-                print(f"搜索模式 {pattern} 时出错: {str(e)}")
-        
-        # 去除重复项
-        unique_environments = []
-        seen_paths = set()
-        
-        for env in found_environments:
-            if env["path"] not in seen_paths:
-                seen_paths.add(env["path"])
-                unique_environments.append(env)
-        
-        return api_response(True, f"找到 {len(unique_environments)} 个Python环境", {
-            "environments": unique_environments
-        })
-        
-    except Exception as e:
-        core.print_status(f"浏览Python环境失败: {e}", 'error')
-        return api_response(False, f"浏览Python环境失败: {str(e)}", status_code=500)
-
-# 获取单个依赖的详细信息
-@app.route('/api/dependency/<package_name>')
-def get_single_dependency(package_name):
-    """获取单个依赖的详细信息，支持安装/卸载/更新后的增量刷新"""
-    try:
-        # 检查是否强制刷新PyPI缓存
-        force_refresh = request.args.get('force_refresh', 'false').lower() == 'true'
-        
-        # 获取单个依赖的信息
-        dep_info = dependency.get_single_dependency_info(package_name, force_refresh)
-        
-        if dep_info:
-            return jsonify(dep_info)
-        else:
-            return api_response(False, f"依赖 {package_name} 未安装或不存在", status_code=404)
-    except Exception as e:
-        core.print_status(f"获取依赖 {package_name} 信息失败: {e}", 'error')
-        return api_response(False, f"获取依赖信息失败: {str(e)}", status_code=500)
+"""
+API模块 - 处理Web API路由和请求响应
+
+此模块提供:
+- Flask应用和路由定义
+- API端点实现
+- 请求处理和响应格式化
+- 文件上传管理
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import queue
+import tempfile
+import shutil
+import uuid
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, jsonify, request, send_from_directory, Response
+import logging
+
+# 尝试导入orjson加速JSON序列化，不可用时回退到标准json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 导入自定义模块
+from . import core
+from . import dependency
+
+# 创建Flask应用实例
+app = Flask(__name__, static_folder='..')
+
+# 跨域支持 - 本地单源工具只需固定的三个响应头，
+# 比flask-cors逐请求的中间件匹配开销小得多
+@app.after_request
+def _cors(resp):
+    headers = resp.headers
+    headers['Access-Control-Allow-Origin'] = '*'
+    headers['Access-Control-Allow-Methods'] = 'GET,POST,OPTIONS'
+    headers['Access-Control-Allow-Headers'] = 'Content-Type'
+    return resp
+
+# 限制上传体积（大型wheel如PyTorch约2GB，留足余量），超限时Werkzeug直接拒绝
+app.config['MAX_CONTENT_LENGTH'] = 4 * 1024 ** 3
+# 限制表单字段驻留内存的大小，大文件part从第一块就落盘而不是内存spool
+app.config['MAX_FORM_MEMORY_SIZE'] = 1024 * 1024
+
+# 使用orjson作为Flask的JSON提供者（C实现，序列化大依赖列表时比标准json快数倍）
+if orjson is not None:
+    from flask.json.provider import JSONProvider
+
+    class OrjsonProvider(JSONProvider):
+        """基于orjson的JSON序列化提供者，所有jsonify调用自动走orjson"""
+
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json_provider_class = OrjsonProvider
+    app.json = OrjsonProvider(app)
+
+
+def json_dumps(obj):
+    """
+    序列化对象为JSON字符串，优先使用orjson
+
+    Args:
+        obj: 要序列化的对象
+
+    Returns:
+        str: JSON字符串
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(obj)
+
+# 后台任务线程池 - 复用线程并限制并发数，避免每个请求都新建线程
+executor = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 4) * 2),
+                              thread_name_prefix='bg')
+atexit.register(executor.shutdown, wait=False)
+
+# 自定义日志配置 - 减少冗余日志输出
+class RequestFilter(logging.Filter):
+    __slots__ = ()
+
+    # 需要静音的高频轮询端点（以元组形式供startswith一次匹配）
+    _MUTED = ('GET /api/check-description-updates',)
+
+    def filter(self, record):
+        # 过滤掉检查描述更新的请求日志
+        # 直接检查record.args中的请求行，避免每条日志都执行getMessage()的%格式化
+        args = record.args
+        if isinstance(args, tuple):
+            for arg in args:
+                if isinstance(arg, str) and arg.startswith(self._MUTED):
+                    return False
+            return True
+        return '/api/check-description-updates' not in str(record.msg)
+
+# 应用日志过滤器
+logging.getLogger('werkzeug').addFilter(RequestFilter())
+# 设置日志级别为WARNING，减少不必要的INFO日志
+logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+# 纯成功响应的预序列化字节
+_OK_BODY = b'{"success":true}'
+
+def _static_error(message):
+    """预序列化固定文案的错误响应体，供热路径直接复用"""
+    return json.dumps({"success": False, "message": message}, ensure_ascii=False).encode('utf-8')
+
+# 各路由的常量错误响应体 - 模块加载时编码一次
+_ERR_NO_UNINSTALL_PACKAGES = _static_error('没有选择要卸载的依赖')
+_ERR_NO_UPDATE_PACKAGES = _static_error('没有选择要更新的依赖')
+_ERR_EMPTY_PACKAGE_NAME = _static_error('包名称不能为空')
+_ERR_EMPTY_DEPENDENCY_NAME = _static_error('依赖名称不能为空')
+_ERR_EMPTY_NAME_OR_VERSION = _static_error('依赖名称和版本不能为空')
+_ERR_TASK_NOT_FOUND = _static_error('任务不存在')
+
+def _error_response(body, status_code=400):
+    """用预序列化的错误体构造响应"""
+    return Response(body, status=status_code, mimetype='application/json')
+
+# 通用API响应格式化
+def api_response(success, message=None, data=None, status_code=200):
+    """
+    格式化API响应
+    
+    Args:
+        success (bool): 操作是否成功
+        message (str, optional): 响应消息
+        data (dict, optional): 响应数据
+        status_code (int): HTTP状态码
+    
+    Returns:
+        Response: 带状态码的Flask JSON响应
+    """
+    # 最常见的"纯成功"响应直接复用预序列化的常量字节
+    if success and message is None and data is None and status_code == 200:
+        return Response(_OK_BODY, mimetype='application/json')
+
+    # 以data为底构造单个字典，避免逐步扩容；直接用orjson序列化跳过jsonify的编码器开销
+    payload = dict(data) if data else {}
+    payload["success"] = success
+    if message:
+        payload["message"] = message
+    return Response(json_dumps(payload), status=status_code, mimetype='application/json')
+
+def _json():
+    """解析请求体JSON，内容类型不符或解析失败时返回空字典"""
+    return request.get_json(silent=True) or {}
+
+# 查询参数的真值集合
+_TRUTHY = frozenset(('true', '1', 'yes', 'on'))
+
+def _bool_arg(key, default=False):
+    """读取布尔型查询参数，缺失时返回default"""
+    value = request.args.get(key)
+    return default if value is None else value.lower() in _TRUTHY
+
+# 静态文件缓存 - 小文件的内容与ETag按mtime缓存，重复请求只做一次stat
+_STATIC_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_STATIC_INLINE_LIMIT = 64 * 1024
+_static_cache = {}
+_static_cache_lock = threading.Lock()
+
+def _serve_static_cached(rel_path):
+    """
+    从内存缓存返回小静态文件，命中If-None-Match时返回304
+
+    Args:
+        rel_path (str): 相对于项目根目录的文件路径
+
+    Returns:
+        Response: 响应对象，不适合走缓存（大文件/不存在等）时返回None
+    """
+    full_path = os.path.normpath(os.path.join(_STATIC_ROOT, rel_path))
+    # 防目录穿越
+    if not full_path.startswith(_STATIC_ROOT + os.sep):
+        return None
+    try:
+        st = os.stat(full_path)
+    except OSError:
+        return None
+    # 大文件交给send_from_directory流式返回
+    if st.st_size > _STATIC_INLINE_LIMIT:
+        return None
+
+    etag = f'"{st.st_mtime_ns}-{st.st_size}"'
+    if request.headers.get('If-None-Match') == etag:
+        return Response(status=304, headers={'ETag': etag})
+
+    with _static_cache_lock:
+        cached = _static_cache.get(full_path)
+    if cached is None or cached[0] != st.st_mtime_ns:
+        import mimetypes
+        try:
+            with open(full_path, 'rb') as f:
+                body = f.read()
+        except OSError:
+            return None
+        mimetype = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+        cached = (st.st_mtime_ns, body, mimetype)
+        with _static_cache_lock:
+            _static_cache[full_path] = cached
+
+    return Response(cached[1], mimetype=cached[2],
+                    headers={'ETag': etag, 'Cache-Control': 'public, max-age=3600'})
+
+# 根路由 - 提供静态文件
+@app.route('/')
+def index():
+    """提供主页HTML"""
+    resp = _serve_static_cached('index.html')
+    if resp is not None:
+        return resp
+    return send_from_directory('..', 'index.html')
+
+@app.route('/<path:path>')
+def serve_static(path):
+    """提供静态文件"""
+    resp = _serve_static_cached(path)
+    if resp is not None:
+        return resp
+    return send_from_directory('..', path, max_age=3600)
+
+# 依赖列表的序列化结果缓存 - 以依赖缓存版本号为键，配合ETag避免重复序列化
+_dependencies_response_cache = {'version': None, 'body': None}
+
+# 获取依赖列表
+@app.route('/api/dependencies')
+def get_dependencies():
+    """获取所有已安装的依赖信息"""
+    try:
+        # 检查是否使用缓存
+        use_cache = _bool_arg('useCache')
+
+        etag = f'W/"{dependency._cache_version}"'
+
+        # 命中ETag时直接返回304，省掉序列化和传输
+        if use_cache and request.headers.get('If-None-Match') == etag:
+            return Response(status=304, headers={'ETag': etag})
+
+        # 同版本的序列化结果直接复用
+        if use_cache and _dependencies_response_cache['version'] == dependency._cache_version:
+            return Response(_dependencies_response_cache['body'],
+                            mimetype='application/json', headers={'ETag': etag})
+
+        # 获取依赖列表
+        dependencies = dependency.get_all_dependencies(use_cache)
+
+        body = dependency.serialize_dependencies(dependencies)
+        _dependencies_response_cache['version'] = dependency._cache_version
+        _dependencies_response_cache['body'] = body
+
+        return Response(body, mimetype='application/json', headers={'ETag': etag})
+    except Exception as e:
+        core.print_status(f"获取依赖列表时出错: {e}", 'error')
+        return api_response(False, f"获取依赖列表失败: {str(e)}", status_code=500)
+
+# 获取依赖当前版本
+@app.route('/api/dependency-current-version/<dependency_name>')
+def get_dependency_current_version(dependency_name):
+    """获取特定依赖的当前版本信息"""
+    try:
+        # 获取依赖信息
+        dep_info = dependency.get_single_dependency(dependency_name)
+        if dep_info:
+            return api_response(True, "获取成功", {"version": dep_info['version']})
+        else:
+            return api_response(False, f"找不到依赖: {dependency_name}", status_code=404)
+    except Exception as e:
+        core.print_status(f"获取依赖版本信息时出错: {e}", 'error')
+        return api_response(False, f"获取依赖版本信息失败: {str(e)}", status_code=500)
+
+# 检查依赖描述更新
+@app.route('/api/check-description-updates')
+def check_description_updates():
+    """检查是否有新的依赖描述信息"""
+    # 获取前端上次更新的时间戳
+    last_update = request.args.get('lastUpdate', type=float) or 0.0
+    # 检查是否为环境变更请求
+    environment_changed = _bool_arg('environmentChanged')
+    current_time = time.time()
+    
+    # 检查是否为首次UI加载后的请求（时间戳接近于0表示首次请求）
+    if last_update < 1:
+        # UI首次加载完成，触发只更新缺失描述的操作
+        executor.submit(dependency.async_update_descriptions, only_missing=True)
+        core.print_status("UI加载完成，开始后台更新缺失的依赖描述", 'info')
+    # 环境变更请求，只更新缺失的依赖描述
+    elif environment_changed:
+        # 环境已变更，触发更新所有依赖描述
+        executor.submit(dependency.async_update_descriptions, only_missing=True)  # 只更新缺失的依赖描述
+        core.print_status("Python环境已切换，开始更新所有的依赖描述", 'info')
+        # 强制标记有更新
+        dependency.last_description_update = current_time
+        dependency.description_update_event.set()
+
+    # 以时间戳判断是否有更新：事件可能已被其他客户端消费（多标签页等），
+    # 但时间戳比较保证错过事件的客户端下次进来也能立即补上
+    has_updates = dependency.last_description_update > last_update
+    if not has_updates:
+        # 长轮询：阻塞等待后台描述更新事件，最多等待25秒
+        # 相比固定间隔轮询，空闲时请求量大幅降低，有更新时近乎零延迟返回
+        dependency.description_update_event.clear()
+        # clear和上面的检查之间完成的更新不能漏掉，等待前再查一次
+        has_updates = dependency.last_description_update > last_update
+        if not has_updates:
+            dependency.description_update_event.wait(timeout=25)
+            has_updates = dependency.last_description_update > last_update
+
+    return jsonify({'hasUpdates': has_updates})
+
+# 批量卸载依赖
+@app.route('/api/batch-uninstall', methods=['POST'])
+def batch_uninstall():
+    """批量卸载多个依赖"""
+    data = _json()
+    packages = data.get('packages', [])
+    
+    if not packages:
+        return _error_response(_ERR_NO_UNINSTALL_PACKAGES)
+    
+    # 创建任务
+    task_id = core.create_task('卸载', packages)
+    
+    # 启动后台任务执行批量卸载
+    executor.submit(dependency.batch_uninstall, packages, task_id)
+    
+    return api_response(True, f'正在卸载 {len(packages)} 个依赖', {'taskId': task_id})
+
+# 安装依赖
+@app.route('/api/install', methods=['POST'])
+def install_dependency_route():
+    """安装依赖"""
+    data = _json()
+    package_name = data.get('packageName', '')
+    
+    if not package_name:
+        return _error_response(_ERR_EMPTY_PACKAGE_NAME)
+
+    # 创建任务
+    task_id = core.create_task('安装', [package_name])
+
+    # 启动后台任务执行安装，立即返回任务ID避免长时间占用请求线程
+    executor.submit(dependency.install_dependency_with_task, package_name, task_id)
+
+    return api_response(True, f'正在安装: {package_name}', {'taskId': task_id})
+
+# 卸载依赖
+@app.route('/api/uninstall', methods=['POST'])
+def uninstall_dependency_route():
+    """卸载依赖"""
+    data = _json()
+    package_name = data.get('dependency', '')
+    
+    if not package_name:
+        return _error_response(_ERR_EMPTY_DEPENDENCY_NAME)
+
+    # 创建任务
+    task_id = core.create_task('卸载', [package_name])
+
+    # 启动后台任务执行卸载，立即返回任务ID避免长时间占用请求线程
+    executor.submit(dependency.uninstall_dependency_with_task, package_name, task_id)
+
+    return api_response(True, f'正在卸载: {package_name}', {'taskId': task_id})
+
+# 更新依赖
+@app.route('/api/update', methods=['POST'])
+def update_dependency_route():
+    """更新依赖到最新版本"""
+    data = _json()
+    package_name = data.get('dependency', '')
+    
+    if not package_name:
+        return _error_response(_ERR_EMPTY_DEPENDENCY_NAME)
+    
+    # 创建任务
+    task_id = core.create_task('更新', [package_name])
+    
+    # 启动后台任务执行更新
+    executor.submit(dependency.update_dependency, package_name, task_id)
+    
+    return api_response(True, f'正在更新: {package_name}', {'taskId': task_id})
+
+# 切换依赖版本
+@app.route('/api/switch-version', methods=['POST'])
+def switch_version_route():
+    """切换依赖版本"""
+    data = _json()
+    package_name = data.get('dependency', '')
+    version = data.get('version', '')
+    
+    if not package_name or not version:
+        return _error_response(_ERR_EMPTY_NAME_OR_VERSION)
+    
+    # 创建任务
+    task_id = core.create_task('切换版本', [f"{package_name}=={version}"])
+    
+    # 启动后台任务执行版本切换
+    executor.submit(dependency.switch_version, package_name, version, task_id)
+    
+    return api_response(True, f'正在将 {package_name} 切换到版本 {version}', {'taskId': task_id})
+
+# 更新所选依赖
+@app.route('/api/update-selected', methods=['POST'])
+def update_selected_route():
+    """更新所选依赖"""
+    data = _json()
+    packages = data.get('packages', [])
+    
+    if not packages:
+        return _error_response(_ERR_NO_UPDATE_PACKAGES)
+    
+    # 创建任务
+    task_id = core.create_task('更新', packages)
+    
+    # 启动后台任务执行批量更新
+    executor.submit(dependency.batch_update, packages, task_id)
+    
+    return api_response(True, f'正在更新 {len(packages)} 个依赖', {'taskId': task_id})
+
+# 长期复用的上传目录 - 免去每次上传mkdtemp/rmtree整目录的开销
+UPLOAD_DIR = os.path.join(tempfile.gettempdir(), 'moduweb-uploads')
+os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+def _sweep_stale_uploads(max_age=24 * 3600):
+    """清理上传目录中超过max_age秒的遗留文件（异常退出时可能残留）"""
+    cutoff = time.time() - max_age
+    try:
+        with os.scandir(UPLOAD_DIR) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+
+# 启动时后台清理一次遗留上传文件
+executor.submit(_sweep_stale_uploads)
+
+def _save_upload_stream(file, target_path):
+    """流式保存上传文件到磁盘，避免把大文件整个读进内存
+
+    Args:
+        file: Werkzeug上传文件对象
+        target_path: 保存的目标路径
+    """
+    with open(target_path, 'wb') as f:
+        shutil.copyfileobj(file.stream, f, length=1024 * 1024)
+
+
+# 上传文件允许的扩展名
+_WHL_EXT = ('.whl',)
+_REQ_EXT = ('.txt',)
+
+# 安装wheel文件
+@app.route('/api/install-whl', methods=['POST'])
+def install_whl_route():
+    """安装wheel文件"""
+    if 'file' not in request.files:
+        return api_response(False, '没有上传文件', status_code=400)
+    
+    file = request.files['file']
+    if file.filename == '':
+        return api_response(False, '没有选择文件', status_code=400)
+
+    # 文件名校验先于任何磁盘I/O，错误类型的上传近乎零成本被拒绝
+    if not file.filename.lower().endswith(_WHL_EXT):
+        return api_response(False, '只支持.whl文件', status_code=400)
+    
+    temp_file_path = None
+    try:
+        # 在复用的上传目录下以唯一文件名保存，无需每次创建临时目录
+        from werkzeug.utils import secure_filename
+        safe_name = f"{uuid.uuid4().hex}-{secure_filename(file.filename)}"
+        temp_file_path = os.path.join(UPLOAD_DIR, safe_name)
+
+        # 流式保存上传的文件（wheel可能有数GB）
+        _save_upload_stream(file, temp_file_path)
+
+        # 创建任务ID用于跟踪进度
+        task_id = core.create_task('安装WHL', [file.filename])
+
+        # 使用线程启动安装过程，实现异步操作
+        def process_whl_install():
+            try:
+                result = dependency.install_whl(temp_file_path, task_id)
+                if not result:
+                    core.complete_task(task_id, [f"安装失败: {file.filename}"])
+            finally:
+                # 确保临时文件被清理
+                try:
+                    os.remove(temp_file_path)
+                except OSError:
+                    pass
+
+        # 启动后台任务
+        executor.submit(process_whl_install)
+
+        return api_response(True, f'正在安装 {file.filename}，请等待...', {'taskId': task_id})
+    except Exception as e:
+        # 确保清理临时文件
+        if temp_file_path:
+            try:
+                os.remove(temp_file_path)
+            except OSError:
+                pass
+        core.print_status(f"处理wheel安装请求时出错: {str(e)}", 'error')
+        return api_response(False, f'安装失败: {str(e)}', status_code=400)
+
+# 安装requirements.txt文件
+@app.route('/api/install-requirements', methods=['POST'])
+def install_requirements_route():
+    """安装requirements.txt文件"""
+    if 'file' not in request.files:
+        return api_response(False, '没有上传文件', status_code=400)
+    
+    file = request.files['file']
+    if file.filename == '':
+        return api_response(False, '没有选择文件', status_code=400)
+    
+    if not file.filename.lower().endswith(_REQ_EXT):
+        return api_response(False, '只支持.txt文件', status_code=400)
+    
+    try:
+        # requirements文件很小，直接读入内存并通过stdin喂给pip，无需落盘
+        content = file.read()
+
+        # 创建任务ID
+        task_id = core.create_task('安装', ['从requirements.txt安装'])
+
+        # 后台处理函数
+        def process_requirements_install():
+            result = dependency.install_requirements_from_bytes(content, task_id)
+            if not result:
+                core.complete_task(task_id, [f"安装失败: {file.filename}"])
+
+        # 启动后台任务
+        executor.submit(process_requirements_install)
+
+        return api_response(True, '正在安装packages，请等待...', {'taskId': task_id})
+    except Exception as e:
+        return api_response(False, f'安装失败: {str(e)}', status_code=500)
+
+# 获取任务进度
+@app.route('/api/task-progress/<task_id>')
+def get_task_progress(task_id):
+    """获取任务进度"""
+    # 单次.get取快照，避免两次查找之间被工作线程删除的竞态
+    task = core.task_progress.get(task_id)
+    if task is None:
+        return _error_response(_ERR_TASK_NOT_FOUND, 404)
+
+    return Response(json_dumps(task.to_dict()), mimetype='application/json')
+
+# 任务进度SSE流
+@app.route('/api/task-progress-stream/<task_id>')
+def task_progress_stream(task_id):
+    """以SSE流推送任务进度，替代前端轮询（保留旧的轮询端点兼容）"""
+    if task_id not in core.task_progress:
+        return _error_response(_ERR_TASK_NOT_FOUND, 404)
+
+    progress_queue = core.subscribe_task_queue(task_id)
+
+    def generate():
+        try:
+            # 先推送当前状态，避免错过订阅前的更新
+            task = core.task_progress.get(task_id)
+            if task is not None:
+                yield f"data: {json_dumps(task.to_dict())}\n\n"
+                if task.status == 'completed':
+                    return
+
+            # 等待后台任务推送更新，进度到达100或超时即结束
+            while True:
+                try:
+                    progress_queue.get(timeout=15)
+                except queue.Empty:
+                    # 超时发送心跳注释，保持连接并让客户端感知存活
+                    yield ": keep-alive\n\n"
+                    continue
+                task = core.task_progress.get(task_id)
+                if task is None:
+                    break
+                yield f"data: {json_dumps(task.to_dict())}\n\n"
+                if task.status == 'completed' or task.progress >= 100:
+                    break
+        finally:
+            core.unsubscribe_task_queue(task_id, progress_queue)
+
+    return Response(
+        generate(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+# 清理PIP缓存
+@app.route('/api/clean-pip-cache', methods=['POST'])
+def clean_pip_cache_route():
+    """清理pip缓存"""
+    # 创建任务
+    task_id = core.create_task('清理缓存', ['pip cache'])
+    
+    # 启动后台任务执行缓存清理
+    executor.submit(dependency.clean_pip_cache, task_id)
+    
+    return api_response(True, '正在清理PIP缓存', {'taskId': task_id})
+
+# 检查所有依赖的最新版本
+@app.route('/api/check-versions', methods=['POST'])
+def check_all_versions():
+    """检查所有依赖的最新版本 - 返回SSE流报告实际进度"""
+    # 创建任务并订阅其进度队列
+    task_id = core.create_task('版本检查', [])
+    progress_queue = core.subscribe_task_queue(task_id)
+
+    # 启动后台任务执行实际的版本检查
+    executor.submit(dependency.async_update_descriptions_and_versions, task_id)
+
+    def generate():
+        try:
+            # 发送初始进度
+            yield json_dumps({"progress": 0}) + "\n"
+
+            # 等待后台任务推送实际进度，进度到达100或超时即结束
+            while True:
+                try:
+                    progress = progress_queue.get(timeout=30)
+                except queue.Empty:
+                    break
+                # 短窗口内排空积压的更新，合并为一次写出，减少小块flush次数
+                try:
+                    while progress < 100:
+                        progress = progress_queue.get(timeout=0.05)
+                except queue.Empty:
+                    pass
+                yield json_dumps({"progress": progress}) + "\n"
+                if progress >= 100:
+                    break
+        except Exception as e:
+            core.print_status(f"检查版本过程出错: {e}", 'error')
+            yield json_dumps({"error": str(e)}) + "\n"
+        finally:
+            core.unsubscribe_task_queue(task_id, progress_queue)
+
+    return Response(
+        generate(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+# 系统信息缓存 - Python/pip版本只在切换环境时才会变化，按环境路径缓存
+_system_info_cache = {'env_path': None, 'payload': None}
+
+def _compute_system_info():
+    """
+    计算当前活动环境的Python/pip版本并写入缓存
+
+    Returns:
+        dict: 系统信息字典
+    """
+    import subprocess
+
+    python_executable = core.get_active_python_executable()
+
+    # 命中缓存时直接返回，省去pip --version子进程开销
+    if _system_info_cache['env_path'] == python_executable and _system_info_cache['payload']:
+        return _system_info_cache['payload']
+
+    # 获取Python版本
+    if python_executable == sys.executable:
+        python_version = sys.version.split()[0]
+    else:
+        version_process = subprocess.run(
+            [python_executable, '--version'],
+            capture_output=True,
+            text=True
+        )
+        version_output = version_process.stdout.strip() or version_process.stderr.strip()
+        python_version = version_output.replace("Python ", "") if version_process.returncode == 0 else "未知"
+
+    # 获取pip版本 - 当前解释器直接读元数据，免去子进程开销
+    if python_executable == sys.executable:
+        try:
+            from importlib.metadata import version as _pkg_version
+            pip_version = _pkg_version('pip')
+        except Exception:
+            pip_version = "未知"
+    else:
+        pip_version_process = subprocess.run(
+            [python_executable, '-m', 'pip', '--version'],
+            capture_output=True,
+            text=True
+        )
+        pip_version = pip_version_process.stdout.split()[1] if pip_version_process.returncode == 0 else "未知"
+
+    payload = {
+        'pythonVersion': python_version,
+        'pipVersion': pip_version
+    }
+    _system_info_cache['env_path'] = python_executable
+    _system_info_cache['payload'] = payload
+    return payload
+
+# 启动时后台预热系统信息，首次UI加载无需等待子进程
+executor.submit(_compute_system_info)
+
+# 获取系统信息
+@app.route('/api/system-info')
+def get_system_info():
+    """获取Python和pip版本信息（按当前活动环境缓存，避免每次都spawn子进程）"""
+    try:
+        return jsonify(_compute_system_info())
+    except Exception as e:
+        core.print_status(f"获取系统信息失败: {e}", 'error')
+        return jsonify({
+            'pythonVersion': '未知',
+            'pipVersion': '未知'
+        }), 500
+
+# 获取缓存信息
+@app.route('/api/cache-info')
+def get_cache_info():
+    """获取缓存信息，包括最后更新时间"""
+    try:
+        cache_info = core.get_cache_info()
+        return jsonify(cache_info)
+    except Exception as e:
+        core.print_status(f"获取缓存信息失败: {e}", 'error')
+        return api_response(False, f"获取缓存信息失败: {str(e)}", status_code=500)
+
+# 依赖分类配置在进程生命周期内不变，启动时预序列化为字节，直接返回
+_dependency_categories_bytes = json_dumps(core.dependency_config).encode('utf-8')
+
+# 获取依赖分类
+@app.route('/api/dependency-categories')
+def get_dependency_categories():
+    """获取依赖分类信息（返回启动时预序列化的响应）"""
+    try:
+        return Response(_dependency_categories_bytes, mimetype='application/json')
+    except Exception as e:
+        core.print_status(f"获取依赖分类信息失败: {e}", 'error')
+        return api_response(False, f"获取依赖分类信息失败: {str(e)}", status_code=500)
+
+# 依赖关系图序列化结果缓存 - 同一环境下同参数的图在环境变化前不会改变
+_graph_response_cache = {}
+
+# 获取依赖关系图数据
+@app.route('/api/dependency-graph/<package_name>')
+def get_dependency_graph(package_name):
+    """获取指定包的依赖关系图数据（缓存序列化结果，环境变化时失效）"""
+    try:
+        # 获取查询参数
+        max_depth = request.args.get('depth', default=2, type=int)  # 默认深度为2层
+        include_dev = _bool_arg('dev')
+
+        # 限制最大深度以避免过大的响应
+        if max_depth > 4:
+            max_depth = 4
+
+        # 命中缓存时直接返回已序列化的字节，跳过图计算和序列化
+        cache_key = (package_name, max_depth, include_dev, dependency._cache_version)
+        cached = _graph_response_cache.get(cache_key)
+        if cached is not None:
+            return Response(cached, mimetype='application/json')
+
+        # 调用依赖模块获取依赖关系图数据
+        graph_data = dependency.get_dependency_graph(package_name, max_depth, include_dev)
+
+        # 序列化并缓存，环境变化（_cache_version递增）后旧键不再命中
+        payload = {"success": True}
+        payload.update(graph_data)
+        body = json_dumps(payload).encode('utf-8')
+        if len(_graph_response_cache) >= 128:
+            _graph_response_cache.clear()
+        _graph_response_cache[cache_key] = body
+
+        return Response(body, mimetype='application/json')
+
+    except Exception as e:
+        app.logger.error(f"获取依赖关系图失败: {str(e)}", exc_info=True)
+        return api_response(False, f"获取依赖关系图失败: {str(e)}", status_code=500)
+
+# 导入新增模块
+import subprocess
+import platform
+import os.path
+
+# 获取所有Python环境
+@app.route('/api/python-environments')
+def get_python_environments():
+    """获取所有已配置的Python环境"""
+    try:
+        environments = core.load_python_environments()
+        
+        # 如果是首次运行且没有环境，尝试添加当前环境
+        if not environments.get("environments") and environments.get("current") is None:
+            current_env = {
+                "id": "system",
+                "name": "当前Python环境",
+                "path": sys.executable,
+                "type": "system",
+                "version": sys.version.split()[0]
+            }
+            environments["environments"] = [current_env]
+            environments["current"] = "system"
+            core.save_python_environments(environments)
+        
+        return jsonify(environments)
+    except Exception as e:
+        core.print_status(f"获取Python环境列表失败: {e}", 'error')
+        return api_response(False, f"获取Python环境列表失败: {str(e)}", status_code=500)
+
+# 保存Python环境
+@app.route('/api/python-environments', methods=['POST'])
+def save_python_environment():
+    """新增或修改Python环境"""
+    try:
+        data = _json()
+        
+        # 加载现有环境
+        environments = core.load_python_environments()
+        
+        # 生成唯一ID
+        import uuid
+        env_id = data.get("id") or str(uuid.uuid4())
+        
+        # 验证环境路径
+        python_path = data.get("path", "")
+        if not python_path or not os.path.exists(python_path):
+            return api_response(False, "Python可执行文件路径无效", status_code=400)
+        
+        # 获取Python版本
+        try:
+            version_process = subprocess.run(
+                [python_path, "--version"], 
+                capture_output=True, 
+                text=True,
+                check=True
+            )
+            version = version_process.stdout.strip() or version_process.stderr.strip()
+            version = version.replace("Python ", "")
+        except Exception as e:
+            return api_response(False, f"无法获取Python版本: {str(e)}", status_code=400)
+        
+        # 创建或更新环境
+        new_env = {
+            "id": env_id,
+            "name": data.get("name", f"Python {version}"),
+            "path": python_path,
+            "type": data.get("type", "custom"),
+            "version": version
+        }
+        
+        # 更新或添加环境
+        updated = False
+        for i, env in enumerate(environments["environments"]):
+            if env["id"] == env_id:
+                environments["environments"][i] = new_env
+                updated = True
+                break
+        
+        if not updated:
+            environments["environments"].append(new_env)
+        
+        # 保存更新
+        if not core.save_python_environments(environments):
+            return api_response(False, "保存环境配置失败", status_code=500)
+        
+        return api_response(True, "环境已保存", {"environment": new_env})
+        
+    except Exception as e:
+        core.print_status(f"保存Python环境失败: {e}", 'error')
+        return api_response(False, f"保存Python环境失败: {str(e)}", status_code=500)
+
+# 删除Python环境
+@app.route('/api/python-environments/<env_id>', methods=['DELETE'])
+def delete_python_environment(env_id):
+    """删除Python环境"""
+    try:
+        # 加载现有环境
+        environments = core.load_python_environments()
+        
+        # 检查是否是当前环境
+        if environments.get("current") == env_id:
+            return api_response(False, "不能删除当前使用的环境", status_code=400)
+        
+        # 查找和删除环境
+        found = False
+        for i, env in enumerate(environments["environments"]):
+            if env["id"] == env_id:
+                del environments["environments"][i]
+                found = True
+                break
+        
+        if not found:
+            return api_response(False, "环境不存在", status_code=404)
+        
+        # 保存更新
+        if not core.save_python_environments(environments):
+            return api_response(False, "保存环境配置失败", status_code=500)
+        
+        return api_response(True, "环境已删除")
+        
+    except Exception as e:
+        core.print_status(f"删除Python环境失败: {e}", 'error')
+        return api_response(False, f"删除Python环境失败: {str(e)}", status_code=500)
+
+# 修改切换环境API
+@app.route('/api/switch-environment', methods=['POST'])
+def switch_environment():
+    """切换到指定的Python环境"""
+    try:
+        data = _json()
+        env_id = data.get("environmentId")
+        
+        if not env_id:
+            return api_response(False, "环境ID不能为空", status_code=400)
+        
+        # 加载环境配置
+        environments = core.load_python_environments()
+        
+        # 查找目标环境
+        target_env = None
+        for env in environments["environments"]:
+            if env["id"] == env_id:
+                target_env = env
+                break
+        
+        if not target_env:
+            return api_response(False, "目标环境不存在", status_code=404)
+        
+        # 检查环境可执行文件是否存在
+        python_path = target_env["path"]
+        if not os.path.exists(python_path):
+            return api_response(False, "Python可执行文件路径无效", status_code=400)
+            
+        # 检查是否是当前环境
+        current_env_id = environments.get("current")
+        if current_env_id == env_id:
+            return api_response(True, "已经是当前环境", {"environment": target_env, "needsRefresh": False})
+            
+        # 更新当前环境
+        environments["current"] = env_id
+        if not core.save_python_environments(environments):
+            return api_response(False, "保存环境配置失败", status_code=500)
+
+        # 环境已变化，失效系统信息缓存和依赖列表缓存
+        _system_info_cache['env_path'] = None
+        dependency.bump_cache_version()
+
+        # 返回成功信息，无需重启应用
+        return api_response(True, "环境切换成功", {
+            "requiresRestart": False, 
+            "needsRefresh": True,
+            "environment": target_env
+        })
+        
+    except Exception as e:
+        core.print_status(f"切换Python环境失败: {e}", 'error')
+        return api_response(False, f"切换Python环境失败: {str(e)}", status_code=500)
+
+def _scan_subdirs(base, prefixes=(), contains=()):
+    """
+    用os.scandir枚举base下匹配的子目录，避免glob逐条fnmatch的开销
+
+    Args:
+        base (str): 要枚举的目录
+        prefixes (tuple): 子目录名前缀（小写比较），命中即返回
+        contains (tuple): 子目录名包含的子串（小写比较）
+        两者都为空时返回所有子目录
+
+    Yields:
+        str: 匹配的子目录完整路径
+    """
+    try:
+        entries = os.scandir(base)
+    except OSError:
+        return
+    with entries:
+        for entry in entries:
+            try:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+            except OSError:
+                continue
+            name = entry.name.lower()
+            if not prefixes and not contains:
+                yield entry.path
+            elif any(name.startswith(p) for p in prefixes) or any(c in name for c in contains):
+                yield entry.path
+
+def _scan_files(base, prefixes):
+    """
+    用os.scandir枚举base下以指定前缀开头的文件
+
+    Args:
+        base (str): 要枚举的目录
+        prefixes (tuple): 文件名前缀（小写比较）
+
+    Yields:
+        str: 匹配的文件完整路径
+    """
+    try:
+        entries = os.scandir(base)
+    except OSError:
+        return
+    with entries:
+        for entry in entries:
+            try:
+                if not entry.is_file(follow_symlinks=True):
+                    continue
+            except OSError:
+                continue
+            if any(entry.name.lower().startswith(p) for p in prefixes):
+                yield entry.path
+
+# patchlevel.h中的完整版本号定义，如 #define PY_VERSION "3.12.1"
+_PY_VERSION_RE = re.compile(r'PY_VERSION\s+"(\d+\.\d+\.[^"]+)"')
+# Windows安装目录名，如 Python312
+_PY_DIRNAME_RE = re.compile(r'^Python(\d)(\d+)$', re.IGNORECASE)
+# 环境类型分类 - venv须放在virtualenv之后以便长词优先匹配
+_ENV_TYPE_RE = re.compile(r'(virtualenv|venv|conda|portable)')
+_ENV_TYPE_MAP = {'virtualenv': 'virtualenv', 'venv': 'virtualenv',
+                 'conda': 'conda', 'portable': 'portable'}
+
+def _quick_python_version(exe_path):
+    """
+    静态读取Python版本，避免为每个候选spawn一次解释器
+
+    Args:
+        exe_path (str): Python可执行文件路径
+
+    Returns:
+        str: 版本号，无法静态判断时返回None
+    """
+    base = os.path.dirname(exe_path)
+    # Windows安装中头文件在安装目录下，Unix安装中exe在bin/下、头文件在../include下
+    header_candidates = [
+        os.path.join(base, 'include', 'patchlevel.h'),
+        os.path.join(os.path.dirname(base), 'include', 'patchlevel.h'),
+    ]
+    for header in header_candidates:
+        try:
+            with open(header, 'r', encoding='utf-8', errors='ignore') as f:
+                m = _PY_VERSION_RE.search(f.read(4096))
+            if m:
+                return m.group(1)
+        except OSError:
+            continue
+    # Windows安装目录名形如Python312，可推断出主次版本
+    m = _PY_DIRNAME_RE.match(os.path.basename(base))
+    if m:
+        return f"{m.group(1)}.{m.group(2)}"
+    return None
+
+def _verify_python_candidate(path):
+    """
+    验证候选路径是否为有效的Python可执行文件
+
+    Args:
+        path (str): 候选可执行文件路径
+
+    Returns:
+        dict: 环境信息字典，无效时返回None
+    """
+    try:
+        # 优先静态读取版本（纯文件I/O），读不到再spawn解释器验证
+        version = _quick_python_version(path)
+        if version is None:
+            version_process = subprocess.run(
+                [path, "--version"],
+                capture_output=True,
+                text=True,
+                timeout=2  # 设置超时避免挂起
+            )
+            if version_process.returncode != 0:
+                return None
+
+            version_output = version_process.stdout.strip() or version_process.stderr.strip()
+            if "Python" not in version_output:
+                return None
+
+            version = version_output.replace("Python ", "").strip()
+
+        # 生成环境名称（lower只做一次，避免循环内重复转换）
+        path_low = path.lower()
+        dirs = path.split(os.sep)
+        dirs_low = path_low.split(os.sep)
+        env_name = f"Python {version}"
+
+        # 尝试从路径推断更好的名称
+        for i in range(len(dirs)-2, 0, -1):
+            if "env" in dirs_low[i] or "conda" in dirs_low[i] or "python" in dirs_low[i]:
+                env_name = f"{dirs[i]} ({version})"
+                break
+
+        # 确定环境类型 - 单次正则匹配替代多次substring扫描
+        m = _ENV_TYPE_RE.search(path_low)
+        env_type = _ENV_TYPE_MAP[m.group(1)] if m else "system"
+
+        return {
+            "path": path,
+            "version": version,
+            "name": env_name,
+            "type": env_type
+        }
+    except Exception as e:
+        print(f"验证Python路径 {path} 时出错: {str(e)}")
+        return None
+
+# 浏览Python环境
+@app.route('/api/browse-python-env', methods=['POST'])
+def browse_python_env():
+    """浏览并查找Python环境"""
+    try:
+        # 根据操作系统，用os.scandir定向枚举常见的Python安装位置
+        # 相比glob通配符匹配，只访问需要的目录层级且不做fnmatch模式匹配
+        os_type = platform.system().lower()
+        candidates = []
+        seen_paths = set()
+
+        def add_candidate(path):
+            if path in seen_paths:
+                return
+            seen_paths.add(path)
+            # 快速过滤：必须是非空的可执行文件
+            if not (os.path.isfile(path) and os.access(path, os.X_OK)):
+                return
+            try:
+                if os.path.getsize(path) == 0:
+                    return
+            except OSError:
+                return
+            candidates.append(path)
+
+        if os_type == 'windows':
+            # 检查常见Windows Python安装位置
+            drives = ['C:', 'D:', 'E:', 'F:']
+            for drive in drives:
+                root = drive + os.sep
+                # 跳过不存在的驱动器，避免无意义的搜索
+                if not os.path.exists(root):
+                    continue
+                # 标准Python安装: <drive>\PythonXY、Program Files下的Python
+                for d in _scan_subdirs(root, prefixes=('python',)):
+                    add_candidate(os.path.join(d, 'python.exe'))
+                for program_dir in ('Program Files', 'Program Files (x86)'):
+                    for d in _scan_subdirs(os.path.join(root, program_dir), prefixes=('python',)):
+                        add_candidate(os.path.join(d, 'python.exe'))
+                # 全局Anaconda安装
+                for d in _scan_subdirs(os.path.join(root, 'ProgramData'), prefixes=('anaconda',)):
+                    add_candidate(os.path.join(d, 'python.exe'))
+                # 盘符根目录下的虚拟环境
+                for d in _scan_subdirs(root, contains=('env',)):
+                    add_candidate(os.path.join(d, 'Scripts', 'python.exe'))
+                # 每个用户目录下的安装和虚拟环境
+                for user_dir in _scan_subdirs(os.path.join(root, 'Users')):
+                    appdata_python = os.path.join(user_dir, 'AppData', 'Local', 'Programs', 'Python')
+                    for d in _scan_subdirs(appdata_python, prefixes=('python',)):
+                        add_candidate(os.path.join(d, 'python.exe'))
+                    for d in _scan_subdirs(user_dir, prefixes=('anaconda', 'miniconda')):
+                        add_candidate(os.path.join(d, 'python.exe'))
+                    for d in _scan_subdirs(user_dir, contains=('env',)):
+                        add_candidate(os.path.join(d, 'Scripts', 'python.exe'))
+        elif os_type in ['linux', 'darwin']:  # Linux or macOS
+            # 检查常见Unix-like系统Python位置
+            home = os.path.expanduser('~')
+            for bin_dir in ('/usr/bin', '/usr/local/bin'):
+                for path in _scan_files(bin_dir, prefixes=('python',)):
+                    add_candidate(path)
+            for d in _scan_subdirs('/opt', prefixes=('anaconda', 'miniconda')):
+                add_candidate(os.path.join(d, 'bin', 'python'))
+            for d in _scan_subdirs(home, prefixes=('anaconda', 'miniconda')):
+                add_candidate(os.path.join(d, 'bin', 'python'))
+            for d in _scan_subdirs(os.path.join(home, '.virtualenvs')):
+                add_candidate(os.path.join(d, 'bin', 'python'))
+            for d in _scan_subdirs(home, contains=('env',)):
+                add_candidate(os.path.join(d, 'bin', 'python'))
+
+        # 验证是I/O密集型工作（每个候选一次子进程），并行执行大幅缩短总耗时
+        unique_environments = []
+        if candidates:
+            with ThreadPoolExecutor(max_workers=min(16, len(candidates))) as verify_pool:
+                for env in verify_pool.map(_verify_python_candidate, candidates):
+                    if env is not None:
+                        unique_environments.append(env)
+
+        return api_response(True, f"找到 {len(unique_environments)} 个Python环境", {
+            "environments": unique_environments
+        })
+        
+    except Exception as e:
+        core.print_status(f"浏览Python环境失败: {e}", 'error')
+        return api_response(False, f"浏览Python环境失败: {str(e)}", status_code=500)
+
+# 获取单个依赖的详细信息
+@app.route('/api/dependency/<package_name>')
+def get_single_dependency(package_name):
+    """获取单个依赖的详细信息，支持安装/卸载/更新后的增量刷新"""
+    try:
+        # 检查是否强制刷新PyPI缓存
+        force_refresh = _bool_arg('force_refresh')
+        
+        # 获取单个依赖的信息
+        dep_info = dependency.get_single_dependency_info(package_name, force_refresh)
+        
+        if dep_info:
+            return jsonify(dep_info)
+        else:
+            return api_response(False, f"依赖 {package_name} 未安装或不存在", status_code=404)
+    except Exception as e:
+        core.print_status(f"获取依赖 {package_name} 信息失败: {e}", 'error')
+        return api_response(False, f"获取依赖信息失败: {str(e)}", status_code=500)
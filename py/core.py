@@ -14,11 +14,33 @@ import os
 import sys
 import time
 import json
+import queue
 import subprocess
 import threading
 import re
-import shlex
-import contextlib
+import copy
+import heapq
+import functools
+import itertools
+import collections
+
+# 尝试导入orjson加速JSON解析和序列化，不可用时回退到标准json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _json_loads(content):
+    """解析JSON字符串，优先使用orjson"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+def _json_dumps_pretty(obj):
+    """序列化对象为带缩进的JSON字符串，优先使用orjson"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, indent=2)
 
 # ===========================================
 # 配置管理部分 (原 config.py)
@@ -33,13 +55,52 @@ CACHE_FILE = os.path.join(CONFIG_DIR, 'dependency_cache.json')
 DEPENDENCIES_CONFIG_FILE = os.path.join(CONFIG_DIR, 'dependencies_config.json')
 # 环境配置文件路径
 PYTHON_ENVS_FILE = os.path.join(CONFIG_DIR, 'python_environments.json')
+# PyPI最新版本缓存文件路径（由dependency模块写入，cache-info接口读取状态）
+PYPI_VERSION_CACHE_FILE = os.path.join(CONFIG_DIR, 'pypi_version_cache.json')
+
+# 确保配置目录存在（exist_ok免去一次前置exists检查）
+try:
+    os.makedirs(CONFIG_DIR, exist_ok=True)
+except Exception as e:
+    print(f"创建config目录失败: {e}")
+
+@functools.lru_cache(maxsize=16)
+def _read_json_file(path, mtime):
+    """
+    读取并解析JSON文件，按(路径, 修改时间)缓存解析结果
+
+    Args:
+        path (str): 文件路径
+        mtime (float): 文件修改时间，仅作为缓存键使用
+
+    Returns:
+        解析后的JSON数据
+    """
+    # 二进制读取，orjson原生接受bytes，省去一次UTF-8解码拷贝
+    with open(path, 'rb') as f:
+        return _json_loads(f.read())
+
+# 哨兵值：区分"文件不存在"和"文件存在但为空/无效"
+_FILE_MISSING = object()
 
-# 确保配置目录存在
-if not os.path.exists(CONFIG_DIR):
+def _read_json_cached(path):
+    """
+    读取JSON文件，文件未变化时复用上次的解析结果
+
+    Args:
+        path (str): 文件路径
+
+    Returns:
+        解析后的JSON数据；文件不存在时返回_FILE_MISSING，为空时返回None
+    """
     try:
-        os.makedirs(CONFIG_DIR)
-    except Exception as e:
-        print(f"创建config目录失败: {e}")
+        st = os.stat(path)
+    except OSError:
+        return _FILE_MISSING
+    # 空文件（或仅有1字节）不可能是有效JSON，直接跳过解析
+    if st.st_size < 2:
+        return None
+    return _read_json_file(path, st.st_mtime)
 
 # 加载依赖配置
 def load_dependencies_config():
@@ -49,12 +110,12 @@ def load_dependencies_config():
     Returns:
         dict: 依赖配置字典
     """
-    if os.path.exists(DEPENDENCIES_CONFIG_FILE):
-        try:
-            with open(DEPENDENCIES_CONFIG_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"加载依赖配置文件失败: {e}")
+    try:
+        config = _read_json_cached(DEPENDENCIES_CONFIG_FILE)
+        if config is not None and config is not _FILE_MISSING:
+            return config
+    except Exception as e:
+        print(f"加载依赖配置文件失败: {e}")
     
     # 如果配置文件不存在或加载失败，返回默认配置
     return {
@@ -76,22 +137,21 @@ def load_description_cache():
     Returns:
         dict: 依赖描述缓存字典
     """
-    if os.path.exists(CACHE_FILE):
-        try:
-            with open(CACHE_FILE, 'r', encoding='utf-8') as f:
-                content = f.read().strip()
-                if content:  # 检查文件是否为空
-                    return json.loads(content)
-                else:
-                    print("依赖描述缓存文件为空，将使用空缓存")
-                    return {}
-        except json.JSONDecodeError:
-            print("依赖描述缓存文件格式无效，将使用空缓存")
-            return {}
-        except Exception as e:
-            print(f"加载缓存文件失败: {e}")
+    try:
+        cache = _read_json_cached(CACHE_FILE)
+        if cache is _FILE_MISSING:
             return {}
-    return {}
+        if cache is not None:
+            return cache
+        # 哨兵已排除文件不存在的情况，到这里说明文件存在但内容为空
+        print("依赖描述缓存文件为空，将使用空缓存")
+        return {}
+    except json.JSONDecodeError:
+        print("依赖描述缓存文件格式无效，将使用空缓存")
+        return {}
+    except Exception as e:
+        print(f"加载缓存文件失败: {e}")
+        return {}
 
 # 保存依赖描述到缓存
 def save_description_cache(dependency_descriptions):
@@ -104,68 +164,78 @@ def save_description_cache(dependency_descriptions):
     Returns:
         bool: 是否保存成功
     """
+    # 先写临时文件再os.replace，进程中途崩溃也不会留下截断的缓存
+    tmp_path = f"{CACHE_FILE}.tmp-{os.getpid()}"
     try:
-        with open(CACHE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(dependency_descriptions, f, ensure_ascii=False, indent=2)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(_json_dumps_pretty(dependency_descriptions))
+        os.replace(tmp_path, CACHE_FILE)
+        # 文件内容已变化，丢弃旧的解析缓存
+        _read_json_file.cache_clear()
         return True
     except Exception as e:
         print(f"保存缓存文件失败: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
         return False
 
 # 获取缓存信息
 def get_cache_info():
     """
     获取缓存状态信息
-    
+
     Returns:
         dict: 缓存信息字典
     """
-    latest_versions_cache_file = os.path.join(CONFIG_DIR, 'latest_versions_cache.json')
-    
     cache_info = {
         'exists': False,
         'last_update': None
     }
-    
-    if os.path.exists(latest_versions_cache_file):
-        try:
-            with open(latest_versions_cache_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if isinstance(data, dict) and 'last_update' in data:
-                    cache_info['exists'] = True
-                    cache_info['last_update'] = data['last_update']
-                elif isinstance(data, dict) and len(data) > 0:
-                    # 旧版缓存格式兼容处理
-                    cache_info['exists'] = True
-                    # 使用文件修改时间作为最后更新时间
-                    cache_info['last_update'] = os.path.getmtime(latest_versions_cache_file)
-        except Exception as e:
-            print(f"读取缓存信息失败: {e}")
-    
+
+    # 单次stat同时提供存在性和mtime，避免exists+getmtime两次系统调用
+    # 版本缓存每次保存都原子整写，文件mtime即最后更新时间，无需解析内容
+    try:
+        st = os.stat(PYPI_VERSION_CACHE_FILE)
+    except OSError:
+        return cache_info
+
+    cache_info['exists'] = True
+    cache_info['last_update'] = st.st_mtime
     return cache_info
 
+# is_cache_valid结果短期记忆 - (检查时刻, 结果)，批量操作时避免重复stat+解析+打印
+_cache_valid_memo = (0.0, False)
+
 # 检查缓存是否有效
 def is_cache_valid():
     """
     检查缓存是否在有效期内
-    
+
     Returns:
         bool: 缓存是否有效
     """
+    global _cache_valid_memo
+    now = time.monotonic()
+    if now - _cache_valid_memo[0] < 5.0:
+        return _cache_valid_memo[1]
+
     cache_info = get_cache_info()
     
     if not cache_info['exists'] or not cache_info['last_update']:
         print('缓存不存在或无效，将执行版本检查')
+        _cache_valid_memo = (now, False)
         return False
-    
-    # 检查缓存是否在有效期内
-    last_update_time = cache_info['last_update'] * 1000  # 转为毫秒
-    current_time = time.time() * 1000
-    cache_age_in_days = (current_time - last_update_time) / (1000 * 60 * 60 * 24)
-    
+
+    # 检查缓存是否在有效期内（直接用秒计算，无需毫秒换算）
+    cache_age_in_days = (time.time() - cache_info['last_update']) / 86400
+
     print(f"缓存年龄: {cache_age_in_days:.2f}天, 缓存{'有效' if cache_age_in_days < 1 else '失效'}")
-    
-    return cache_age_in_days < 1
+
+    result = cache_age_in_days < 1
+    _cache_valid_memo = (now, result)
+    return result
 
 # 加载Python环境配置
 def load_python_environments():
@@ -180,13 +250,18 @@ def load_python_environments():
         "current": None
     }
     
-    if os.path.exists(PYTHON_ENVS_FILE):
-        try:
-            with open(PYTHON_ENVS_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"加载Python环境配置文件失败: {e}")
-    
+    try:
+        environments = _read_json_cached(PYTHON_ENVS_FILE)
+        if environments is None:
+            # 文件存在但内容为空/无效时不覆盖，按默认配置返回
+            return default_environments
+        if environments is not _FILE_MISSING:
+            # 返回深拷贝：调用方会就地修改后再保存，若保存失败，
+            # 直接交出缓存对象会让未持久化的修改残留在解析缓存里
+            return copy.deepcopy(environments)
+    except Exception as e:
+        print(f"加载Python环境配置文件失败: {e}")
+
     # 如果配置文件不存在或加载失败，创建默认配置文件
     save_python_environments(default_environments)
     return default_environments
@@ -202,36 +277,63 @@ def save_python_environments(environments):
     Returns:
         bool: 是否保存成功
     """
+    # 先写临时文件再os.replace，序列化一次、单次write写出，且替换是原子的
+    tmp_path = f"{PYTHON_ENVS_FILE}.tmp-{os.getpid()}"
     try:
-        with open(PYTHON_ENVS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(environments, f, ensure_ascii=False, indent=2)
+        data = _json_dumps_pretty(environments).encode('utf-8')
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, PYTHON_ENVS_FILE)
+        # 文件内容已变化，丢弃旧的解析缓存
+        _read_json_file.cache_clear()
         return True
     except Exception as e:
         print(f"保存Python环境配置失败: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
         return False
 
+# 活动环境解析缓存 - (环境配置文件mtime, 环境id) -> 已验证的可执行文件路径
+_active_exe_cache = {'key': None, 'path': None}
+
 # 添加获取当前活动Python环境路径函数
 def get_active_python_executable():
     """
     获取当前活动的Python可执行文件路径
-    
+
     Returns:
         str: Python可执行文件路径
     """
+    # 配置文件未变且环境id未变时直接返回上次解析结果，省去线性查找和exists检查
+    try:
+        envs_mtime = os.stat(PYTHON_ENVS_FILE).st_mtime
+    except OSError:
+        envs_mtime = 0.0
+
     environments = load_python_environments()
     current_env_id = environments.get('current')
-    
+
     if not current_env_id:
         # 默认使用当前Python
         return sys.executable
-    
+
+    cache_key = (envs_mtime, current_env_id)
+    if _active_exe_cache['key'] == cache_key:
+        return _active_exe_cache['path']
+
     # 查找当前环境信息
+    path = sys.executable
     for env in environments.get('environments', []):
         if env.get('id') == current_env_id and os.path.exists(env.get('path', '')):
-            return env.get('path')
-    
+            path = env.get('path')
+            break
+
+    _active_exe_cache['key'] = cache_key
+    _active_exe_cache['path'] = path
     # 如果找不到有效的环境，返回当前Python
-    return sys.executable
+    return path
 
 # ===========================================
 # 工具函数部分 (原 utils.py)
@@ -247,8 +349,65 @@ class Colors:
     ENDC = '\033[0m'
     BOLD = '\033[1m'
 
-# 全局任务进度跟踪字典
-task_progress = {}
+# 全局任务进度跟踪字典 - OrderedDict按完成先后排序，容量有上限
+# 超限时从最旧的已完成任务开始淘汰，即使清理线程未运行内存也不会无限增长
+task_progress = collections.OrderedDict()
+_MAX_TASKS = 1024
+
+# 任务进度订阅队列（task_id -> [queue.Queue, ...]），供SSE等实时推送进度使用
+# 同一任务可能被多个客户端（如多个浏览器标签页）同时订阅，按列表保存
+task_queues = {}
+_task_queues_lock = threading.Lock()
+
+def subscribe_task_queue(task_id):
+    """
+    为任务注册一个进度订阅队列，任务进度变化时会推送到该队列
+
+    Args:
+        task_id (str): 任务ID
+
+    Returns:
+        queue.Queue: 进度队列
+    """
+    q = queue.Queue()
+    with _task_queues_lock:
+        task_queues.setdefault(task_id, []).append(q)
+    return q
+
+def unsubscribe_task_queue(task_id, q):
+    """
+    取消任务的一个进度订阅队列，只移除调用方自己的队列
+
+    Args:
+        task_id (str): 任务ID
+        q (queue.Queue): subscribe_task_queue返回的队列
+    """
+    with _task_queues_lock:
+        queues = task_queues.get(task_id)
+        if queues is None:
+            return
+        try:
+            queues.remove(q)
+        except ValueError:
+            pass
+        if not queues:
+            task_queues.pop(task_id, None)
+
+def _publish_task_progress(task_id, progress):
+    """向任务的所有订阅队列推送进度（如果存在订阅者）"""
+    with _task_queues_lock:
+        queues = list(task_queues.get(task_id, ()))
+    for q in queues:
+        q.put(progress)
+
+# 各状态的前后缀只拼接一次，print_status每次调用只查一次字典
+_STATUS_FORMATS = {
+    'success': (f"{Colors.GREEN}【成功】", f"{Colors.ENDC}\n"),
+    'error': (f"{Colors.FAIL}【错误】", f"{Colors.ENDC}\n"),
+    'warning': (f"{Colors.WARNING}【警告】", f"{Colors.ENDC}\n"),
+    'start': (f"{Colors.BLUE}【开始】", f"{Colors.ENDC}\n"),
+    'info': (f"{Colors.BOLD}【信息】", f"{Colors.ENDC}\n"),
+}
 
 # 格式化中文提示输出
 def print_status(message, status='info'):
@@ -259,63 +418,56 @@ def print_status(message, status='info'):
         message (str): 要打印的消息
         status (str): 消息类型 ('success', 'error', 'warning', 'start', 'info')
     """
-    if status == 'success':
-        print(f"{Colors.GREEN}【成功】{message}{Colors.ENDC}")
-    elif status == 'error':
-        print(f"{Colors.FAIL}【错误】{message}{Colors.ENDC}")
-    elif status == 'warning':
-        print(f"{Colors.WARNING}【警告】{message}{Colors.ENDC}")
-    elif status == 'start':
-        print(f"{Colors.BLUE}【开始】{message}{Colors.ENDC}")
-    else:
-        print(f"{Colors.BOLD}【信息】{message}{Colors.ENDC}")
+    prefix, suffix = _STATUS_FORMATS.get(status, _STATUS_FORMATS['info'])
+    sys.stdout.write(f"{prefix}{message}{suffix}")
 
-# 封装安全的文件读写操作
-@contextlib.contextmanager
-def safe_open_file(file_path, mode='r', encoding='utf-8'):
-    """
-    安全打开文件的上下文管理器
-    
-    Args:
-        file_path (str): 文件路径
-        mode (str): 打开模式
-        encoding (str): 文件编码
-        
-    Yields:
-        file: 打开的文件对象
+# 通用任务管理函数
+class TaskState:
+    """任务进度状态 - __slots__固定字段，比逐任务字典省内存且属性访问更快
+
+    每个任务自带一把锁：进度由工作线程更新、由API线程读取，
+    锁保证progress/current/message等多字段更新不会被读到一半
     """
-    try:
-        f = open(file_path, mode, encoding=encoding)
-        yield f
-    except Exception as e:
-        print(f"文件操作失败 [{file_path}]: {e}")
-        raise
-    finally:
-        if 'f' in locals():
-            f.close()
+    __slots__ = ('progress', 'total', 'current', 'status', 'message', 'errors', 'lock')
+
+    def __init__(self, total, message):
+        self.progress = 0
+        self.total = total
+        self.current = 0
+        self.status = 'running'
+        self.message = message
+        self.errors = []
+        self.lock = threading.Lock()
+
+    def to_dict(self):
+        """转为可JSON序列化的字典（对外接口格式保持不变），在锁内取一致快照"""
+        with self.lock:
+            return {
+                'progress': self.progress,
+                'total': self.total,
+                'current': self.current,
+                'status': self.status,
+                'message': self.message,
+                'errors': list(self.errors)
+            }
+
+# 任务ID只需进程内唯一（task_progress是内存字典），
+# 自增计数器比uuid4省去每次os.urandom；带PID前缀避免重启后与前端残留的旧ID混淆
+_task_counter = itertools.count(1)
 
-# 通用任务管理函数
 def create_task(task_type, items):
     """
     创建一个新任务
-    
+
     Args:
         task_type (str): 任务类型
         items (list): 任务项列表
-        
+
     Returns:
         str: 任务ID
     """
-    import uuid
-    task_id = str(uuid.uuid4())
-    task_progress[task_id] = {
-        'progress': 0,
-        'total': len(items),
-        'current': 0,
-        'status': 'running',
-        'message': f'准备{task_type}',
-        'errors': []
-    }
+    task_id = f"{os.getpid()}-{next(_task_counter)}"
+    task_progress[task_id] = TaskState(len(items), f'准备{task_type}')
     return task_id
 
 def update_task_progress(task_id, current, message=None):
@@ -327,15 +479,26 @@ def update_task_progress(task_id, current, message=None):
         current (int): 当前进度
         message (str, optional): 进度消息
     """
-    if task_id not in task_progress:
+    task = task_progress.get(task_id)
+    if task is None:
         return
-    
-    task = task_progress[task_id]
-    task['current'] = current
-    task['progress'] = int((current / task['total']) * 100) if task['total'] > 0 else 0
-    
-    if message:
-        task['message'] = message
+
+    # 整数运算算百分比；百分比和消息都没变化时直接返回（pip输出里最常见的情况）
+    with task.lock:
+        total = task.total
+        new_progress = (current * 100 // total) if total > 0 else 0
+        if new_progress == task.progress and message is None:
+            task.current = current
+            return
+
+        task.current = current
+        task.progress = new_progress
+
+        if message:
+            task.message = message
+
+    # 推送进度给订阅者
+    _publish_task_progress(task_id, new_progress)
 
 def complete_task(task_id, errors=None):
     """
@@ -345,201 +508,352 @@ def complete_task(task_id, errors=None):
         task_id (str): 任务ID
         errors (list, optional): 错误列表
     """
-    if task_id not in task_progress:
+    task = task_progress.get(task_id)
+    if task is None:
         return
-    
-    task_progress[task_id]['status'] = 'completed'
-    task_progress[task_id]['progress'] = 100
-    task_progress[task_id]['message'] = '处理完成'
-    
-    if errors:
-        task_progress[task_id]['errors'] = errors
-    
+
+    with task.lock:
+        task.status = 'completed'
+        task.progress = 100
+        task.message = '处理完成'
+
+        if errors:
+            task.errors = errors
+
+    # 已完成任务移到末尾，超限时从最旧端淘汰已完成的任务
+    task_progress.move_to_end(task_id)
+    while len(task_progress) > _MAX_TASKS:
+        oldest_id = next(iter(task_progress))
+        if task_progress[oldest_id].status != 'completed':
+            break
+        task_progress.pop(oldest_id, None)
+
+    # 推送完成进度给订阅者
+    _publish_task_progress(task_id, 100)
+
     # 安排任务清理
     schedule_task_cleanup(task_id)
 
+# 任务清理调度 - 单个后台线程按到期时间堆驱动，线程数不随任务数增长
+_cleanup_heap = []
+_cleanup_cv = threading.Condition()
+_cleanup_thread_started = False
+
+def _cleanup_reaper():
+    """后台清理线程：等待堆顶任务到期后将其从task_progress中移除"""
+    while True:
+        with _cleanup_cv:
+            while not _cleanup_heap:
+                _cleanup_cv.wait()
+            expiry, task_id = _cleanup_heap[0]
+            now = time.time()
+            if expiry > now:
+                _cleanup_cv.wait(timeout=expiry - now)
+                continue
+            heapq.heappop(_cleanup_heap)
+        task_progress.pop(task_id, None)
+
 def schedule_task_cleanup(task_id, delay=86400):
     """
     安排任务清理
-    
+
     Args:
         task_id (str): 任务ID
         delay (int): 延迟时间（秒）
     """
-    def cleanup_task():
-        time.sleep(delay)  # 默认24小时后清理
-        if task_id in task_progress:
-            del task_progress[task_id]
-    
-    threading.Thread(target=cleanup_task, daemon=True).start()
+    global _cleanup_thread_started
+    with _cleanup_cv:
+        heapq.heappush(_cleanup_heap, (time.time() + delay, task_id))
+        if not _cleanup_thread_started:
+            threading.Thread(target=_cleanup_reaper, daemon=True).start()
+            _cleanup_thread_started = True
+        _cleanup_cv.notify()
 
 # 通用批量处理功能
-def process_batch_operation(packages, task_id, operation_func, should_skip_func=None, skip_message=""):
+def process_batch_operation(packages, task_id, operation_func, should_skip_func=None, skip_message="",
+                            batch_operation_func=None):
     """
     通用批量操作处理
-    
+
     Args:
         packages (list): 包名称列表
         task_id (str): 任务ID
         operation_func (callable): 操作函数
         should_skip_func (callable, optional): 判断是否应该跳过的函数
         skip_message (str, optional): 跳过时的消息
+        batch_operation_func (callable, optional): 整批处理函数，接收包列表；
+            提供时一次性处理全部未跳过的包（如单次pip调用），免去逐包进程开销
     """
     errors = []
     total = len(packages)
-    
-    for index, pkg in enumerate(packages):
-        try:
-            # 检查是否应该跳过
-            if should_skip_func and should_skip_func(pkg):
-                errors.append(f"{pkg}: {skip_message}")
-                continue
-            
-            # 更新进度
-            update_task_progress(
-                task_id, 
-                index + 1, 
-                f'处理 {pkg} ({index + 1}/{total})'
-            )
-            
-            # 执行操作
-            operation_func(pkg)
-            
-        except Exception as e:
-            errors.append(f"{pkg}: {str(e)}")
-    
+    _update = update_task_progress
+
+    if batch_operation_func is not None:
+        # 整批路径：先过滤跳过项，再一次调用处理全部剩余包
+        remaining = packages
+        if should_skip_func is not None:
+            remaining = []
+            for pkg in packages:
+                if should_skip_func(pkg):
+                    errors.append(f"{pkg}: {skip_message}")
+                else:
+                    remaining.append(pkg)
+        if remaining:
+            try:
+                _update(task_id, 1, f'批量处理 {len(remaining)} 个包')
+                batch_operation_func(remaining)
+            except Exception as e:
+                errors.append(f"批量操作失败: {str(e)}")
+        complete_task(task_id, errors)
+        return
+
+    if should_skip_func is None:
+        # 无跳过检查的快路径，循环内少一次真值判断
+        for index, pkg in enumerate(packages, 1):
+            try:
+                _update(task_id, index, f'处理 {pkg} ({index}/{total})')
+                operation_func(pkg)
+            except Exception as e:
+                errors.append(f"{pkg}: {str(e)}")
+    else:
+        for index, pkg in enumerate(packages, 1):
+            try:
+                # 检查是否应该跳过
+                if should_skip_func(pkg):
+                    errors.append(f"{pkg}: {skip_message}")
+                    continue
+
+                # 更新进度并执行操作
+                _update(task_id, index, f'处理 {pkg} ({index}/{total})')
+                operation_func(pkg)
+            except Exception as e:
+                errors.append(f"{pkg}: {str(e)}")
+
     # 完成任务
     complete_task(task_id, errors)
 
-def stream_process_output(cmd, task_id, package_name=None):
+# stdout非终端（重定向到日志/管道）时不打印\r动画进度条，避免刷屏日志
+_IS_TTY = sys.stdout.isatty()
+
+# 子进程环境只构建一次：继承当前环境（代理、PATH等pip都需要），
+# 并强制无缓冲输出，保证进度行实时到达而不积压在子进程缓冲区
+_CHILD_ENV = dict(os.environ, PYTHONUNBUFFERED='1', PYTHONIOENCODING='utf-8')
+
+# 进度输出解析正则 - 模块级预编译，供所有任务共享
+# 直接匹配bytes输出，只有命中的片段才需要解码
+# 形如 "45%|████      | 3.6MB/8.1MB" 的详细进度
+_PROGRESS_RE = re.compile(rb'(\d+)%\|.*\| (\d+(\.\d+)?)([kKmMgG]i?B)/(\d+(\.\d+)?)([kKmMgG]i?B)')
+# 简单百分比，如 "Installing... 30%"
+_SIMPLE_PCT_RE = re.compile(rb'(\d+)%')
+# 步骤行，如 "Collecting numpy"
+_STEP_RE = re.compile(rb'(Building|Collecting|Installing|Processing)\s+(\S+)')
+# 步骤行前缀，用于在跑正则前先做廉价的startswith过滤
+_STEP_PREFIXES = (b'Building', b'Collecting', b'Installing', b'Processing')
+
+def _iter_output_lines(stream, chunk_size=65536):
+    """
+    按块读取子进程输出并在本地切分为行
+
+    相比逐行readline，每次read1最多只过一次系统调用边界就能取回
+    缓冲区里已有的全部数据，长输出时Python层的循环次数大幅减少。
+
+    Args:
+        stream: 子进程的二进制stdout
+        chunk_size (int): 单次读取的最大字节数
+
+    Yields:
+        bytes: 不含换行符的单行输出
+    """
+    buf = b''
+    while True:
+        chunk = stream.read1(chunk_size)
+        if not chunk:
+            break
+        buf += chunk
+        if b'\n' not in buf:
+            continue
+        *complete, buf = buf.split(b'\n')
+        for line in complete:
+            yield line
+    # 进程结束后残留的最后一段（无换行结尾）也作为一行处理
+    if buf:
+        yield buf
+
+def stream_process_output(cmd, task_id, package_name=None, input_data=None):
     """
     流式处理命令输出并更新进度条
-    
+
     Args:
-        cmd (list or str): 命令及参数
+        cmd (list): 命令及参数列表
         task_id (str): 任务ID
         package_name (str, optional): 包名称
-        
+        input_data (str, optional): 写入进程标准输入的内容
+
     Returns:
         bool: 命令是否成功执行
     """
     try:
         # 设置初始进度
         update_task_progress(task_id, 0, f'开始处理 {package_name or cmd}...')
-        
-        # 分割命令为参数列表
-        if isinstance(cmd, str):
-            cmd = shlex.split(cmd)
-            
+
         # 启动进程并捕获实时输出
+        # 二进制模式+大缓冲区读取，避免TextIOWrapper逐字符解码的开销
         process = subprocess.Popen(
             cmd,
+            stdin=subprocess.PIPE if input_data is not None else None,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1,
-            universal_newlines=True
+            bufsize=65536,
+            env=_CHILD_ENV
         )
+
+        # 有输入内容时一次写入并关闭stdin（requirements等小内容不会阻塞）
+        if input_data is not None:
+            if isinstance(input_data, str):
+                input_data = input_data.encode('utf-8')
+            process.stdin.write(input_data)
+            process.stdin.close()
         
         # 用于跟踪进度的变量
         download_started = False
         current_percent = 0
         current_status = f'准备 {package_name or "任务"}...'
-        
-        # 正则表达式用于匹配不同类型的进度输出
-        progress_pattern = re.compile(r'(\d+)%\|.*\| (\d+(\.\d+)?)([kKmMgG]i?B)/(\d+(\.\d+)?)([kKmMgG]i?B)')
-        simple_percent_pattern = re.compile(r'(\d+)%')
-        step_pattern = re.compile(r'(Building|Collecting|Installing|Processing)\s+([^\s]+)')
-        
-        # 处理每一行输出
-        for line in iter(process.stdout.readline, ''):
+
+        # 原始输出攒在字节缓冲里、满4KB才写stdout，syscall数约降一个量级；
+        # 原样转发bytes，省去逐行decode再encode的往返
+        out = sys.stdout.buffer
+        line_buf = bytearray()
+
+        def _flush_lines():
+            if line_buf:
+                out.write(line_buf)
+                out.flush()
+                line_buf.clear()
+
+        def _write_line(raw):
+            line_buf.extend(raw)
+            line_buf.extend(b'\n')
+            if len(line_buf) >= 4096:
+                _flush_lines()
+
+        # 进度条打印节流：百分比变化且距上次打印超过50ms才刷新，
+        # 避免快速安装时每秒数千次stdout写入成为瓶颈
+        last_printed_pct = -1
+        last_print_ts = 0.0
+
+        def print_progress_bar(percent, status):
+            nonlocal last_printed_pct, last_print_ts
+            if not _IS_TTY:
+                return
+            now = time.monotonic()
+            if percent == last_printed_pct or now - last_print_ts < 0.05:
+                return
+            last_printed_pct = percent
+            last_print_ts = now
+            # 进度条前先冲刷积压的原始行，避免两路输出交错
+            _flush_lines()
+            sys.stdout.write(f"\r{create_cli_progress_bar(percent)} {status}")
+            sys.stdout.flush()
+
+        # 处理每一行输出（bytes），正则直接在bytes上匹配
+        # 按64KB块读取后本地切行，避免逐行readline的调用开销
+        for line in _iter_output_lines(process.stdout):
             line = line.strip()
-            
+
             # 跳过空行
             if not line:
                 continue
-                
-            # 打印原始输出
-            print(line)
-            
-            # 尝试解析进度信息
-            progress_match = progress_pattern.search(line)
-            simple_match = simple_percent_pattern.search(line)
-            step_match = step_pattern.search(line)
-            
+
+            # 打印原始输出（缓冲写）
+            _write_line(line)
+
+            # 先用廉价的子串/前缀判断分流，每行最多只跑一个正则：
+            # 大多数pip输出行既不含百分号也不是步骤行，直接走else分支
+            progress_match = simple_match = step_match = None
+            if b'%' in line:
+                progress_match = _PROGRESS_RE.search(line)
+                if not progress_match:
+                    simple_match = _SIMPLE_PCT_RE.search(line)
+            elif line.startswith(_STEP_PREFIXES):
+                step_match = _STEP_RE.search(line)
+
             # 如果找到进度百分比信息 (例如: "45%|████      | 3.6/8.1MB")
             if progress_match:
                 percent = int(progress_match.group(1))
-                downloaded_str = progress_match.group(2)
-                downloaded_unit = progress_match.group(4)
-                total_str = progress_match.group(5)
-                total_unit = progress_match.group(7)
-                
+                downloaded = progress_match.group(2) + progress_match.group(4)
+                total_size = progress_match.group(5) + progress_match.group(7)
+
                 # 更新进度信息
                 download_started = True
                 current_percent = percent
-                current_status = f"下载中: {downloaded_str}{downloaded_unit}/{total_str}{total_unit} ({percent}%)"
-                
-                # 创建命令行进度条
-                progress_bar = create_cli_progress_bar(percent)
-                print(f"\r{progress_bar} {current_status}", end="")
-                
+                current_status = f"下载中: {downloaded.decode()}/{total_size.decode()} ({percent}%)"
+
+                # 节流打印命令行进度条
+                print_progress_bar(percent, current_status)
+
                 # 更新任务进度
                 update_task_progress(task_id, percent, current_status)
             
             # 简单百分比匹配 (例如: "Installing... 30%")
-            elif simple_match and not progress_match:
+            elif simple_match:
                 percent = int(simple_match.group(1))
                 if percent > current_percent:  # 只更新更高的进度
                     current_percent = percent
                     current_status = f"处理中: {percent}%"
-                    # 创建命令行进度条
-                    progress_bar = create_cli_progress_bar(percent)
-                    print(f"\r{progress_bar} {current_status}", end="")
-                    
+                    # 节流打印命令行进度条
+                    print_progress_bar(percent, current_status)
+
                     # 更新任务进度
                     update_task_progress(task_id, percent, current_status)
             
             # 如果找到步骤信息 (例如: "Collecting numpy" 或 "Installing collected packages: pip")
             elif step_match:
                 action = step_match.group(1)
-                package = step_match.group(2)
-                
+                package = step_match.group(2).decode('utf-8', 'replace')
+
                 # 根据不同步骤设置不同的进度
-                if action == "Collecting" and not download_started:
+                if action == b"Collecting" and not download_started:
                     update_task_progress(task_id, 10, f"收集依赖包: {package}")
                     current_status = f"收集依赖包: {package}"
-                elif action == "Building":
+                elif action == b"Building":
                     update_task_progress(task_id, max(30, current_percent), f"构建包: {package}")
                     current_status = f"构建包: {package}"
-                elif action == "Installing":
+                elif action == b"Installing":
                     update_task_progress(task_id, max(70, current_percent), f"安装包: {package}")
                     current_status = f"安装包: {package}"
             
             # 对于没有明确进度信息的行，至少提供一些状态更新
             else:
-                # 检查是否是某些特殊状态
-                if "Successfully installed" in line:
+                # 检查是否是某些特殊状态 - pip把这两类提示打在行首，
+                # 前缀判断即可命中，不必全行子串扫描
+                if line.startswith(b"Successfully installed"):
                     current_percent = 100
-                    installed_packages = line.replace("Successfully installed", "").strip()
+                    installed_packages = line[len(b"Successfully installed"):].strip().decode('utf-8', 'replace')
                     current_status = f"成功安装: {installed_packages}"
                     update_task_progress(task_id, 100, current_status)
-                    print(f"\r{create_cli_progress_bar(100)} {current_status}")
-                elif "Requirement already satisfied" in line:
-                    package_info = line.replace("Requirement already satisfied:", "").strip().split()[0]
+                    if _IS_TTY:
+                        _flush_lines()
+                        print(f"\r{create_cli_progress_bar(100)} {current_status}")
+                elif line.startswith(b"Requirement already satisfied:"):
+                    package_info = line[len(b"Requirement already satisfied:"):].strip().split()[0].decode('utf-8', 'replace')
                     current_status = f"依赖已满足: {package_info}"
                     update_task_progress(task_id, max(50, current_percent), current_status)
         
+        # 输出结束，冲刷缓冲中剩余的原始行
+        _flush_lines()
+
         # 等待进程完成并获取返回码
         return_code = process.wait()
-        
+
         # 确保进度条显示完成
         if current_percent < 100 and return_code == 0:
             update_task_progress(task_id, 100, "处理完成")
-            print(f"\r{create_cli_progress_bar(100)} 处理完成")
-        
+            if _IS_TTY:
+                print(f"\r{create_cli_progress_bar(100)} 处理完成")
+
         # 确保光标移到下一行
-        print()
+        if _IS_TTY:
+            print()
         
         # 返回进程状态
         return return_code == 0
@@ -549,17 +863,26 @@ def stream_process_output(cmd, task_id, package_name=None):
         update_task_progress(task_id, 100, f"处理出错: {str(e)}")
         return False
 
+# 默认宽度下只有101种进度条（0~100%），预先生成，调用时仅做索引
+_BAR_WIDTH = 30
+_BARS = tuple(
+    f"[{'#' * (_BAR_WIDTH * p // 100)}{' ' * (_BAR_WIDTH - _BAR_WIDTH * p // 100)}] {p}%"
+    for p in range(101)
+)
+
 def create_cli_progress_bar(percent, width=30):
     """
     创建命令行ASCII进度条
-    
+
     Args:
         percent (int): 进度百分比
         width (int): 进度条宽度
-        
+
     Returns:
         str: ASCII进度条字符串
     """
+    if width == _BAR_WIDTH:
+        return _BARS[max(0, min(100, percent))]
     completed = int(width * percent / 100)
     remaining = width - completed
     return f"[{'#' * completed}{' ' * remaining}] {percent}%"
@@ -569,8 +892,9 @@ def create_cli_progress_bar(percent, width=30):
 # ===========================================
 
 # 加载所有配置
+# 分类集合用frozenset存储（统一小写），成员检查O(1)且自动去重
 dependency_config = load_dependencies_config()
-SYSTEM_DEPENDENCIES = dependency_config.get('systemDependencies', [])
-CORE_DEPENDENCIES = dependency_config.get('dataScienceDependencies', [])
-AI_MODEL_DEPENDENCIES = dependency_config.get('aiDependencies', [])
-APP_DEPENDENCIES = dependency_config.get('softwareDependencies', [])
+SYSTEM_DEPENDENCIES = frozenset(map(str.lower, dependency_config.get('systemDependencies', [])))
+CORE_DEPENDENCIES = frozenset(map(str.lower, dependency_config.get('dataScienceDependencies', [])))
+AI_MODEL_DEPENDENCIES = frozenset(map(str.lower, dependency_config.get('aiDependencies', [])))
+APP_DEPENDENCIES = frozenset(map(str.lower, dependency_config.get('softwareDependencies', [])))
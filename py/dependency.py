@@ -1,1290 +1,1990 @@
-"""
-依赖管理模块 - 处理与Python包依赖相关的功能
-
-此模块负责：
-- 获取已安装的Python依赖信息
-- 分类和处理依赖数据
-- 提供依赖安装、卸载、更新和版本切换功能
-- 处理批量操作和任务管理
-"""
-
-import os
-import sys
-import json
-import time
-import subprocess
-import threading
-import tempfile
-import shutil
-import requests
-import re
-from packaging import version
-
-if sys.version_info < (3,8):
-    from importlib_metadata import distributions
-else:
-    from importlib.metadata import distributions
-
-# 导入自定义模块
-from . import core
-
-# 从core模块导入配置数据
-SYSTEM_DEPENDENCIES = core.SYSTEM_DEPENDENCIES
-CORE_DEPENDENCIES = core.CORE_DEPENDENCIES
-AI_MODEL_DEPENDENCIES = core.AI_MODEL_DEPENDENCIES
-APP_DEPENDENCIES = core.APP_DEPENDENCIES
-CONFIG_DIR = core.CONFIG_DIR
-
-# 依赖描述缓存
-dependency_descriptions = {}
-
-# 加载缓存的依赖描述
-def load_descriptions():
-    """
-    加载依赖描述缓存
-    
-    Returns:
-        dict: 依赖描述字典    """
-    global dependency_descriptions
-    dependency_descriptions = core.load_description_cache()
-    return dependency_descriptions
-
-# 保存依赖描述缓存
-def save_descriptions():
-    """
-    保存依赖描述到缓存文件
-    
-    Returns:
-        bool: 是否成功保存
-    """
-    return core.save_description_cache(dependency_descriptions)
-
-# 获取单个依赖信息
-def get_single_dependency(package_name):
-    """
-    获取单个依赖的详细信息
-    
-    Args:
-        package_name (str): 依赖包名称
-        
-    Returns:
-        dict: 依赖信息字典，如果找不到则返回None
-    """
-    try:
-        # 获取当前环境中安装的所有依赖
-        all_dependencies = get_all_dependencies(use_cache=False)
-        
-        # 查找指定依赖
-        for dep in all_dependencies:
-            if dep.get('name', '').lower() == package_name.lower():
-                return dep
-                
-        return None
-    except Exception as e:
-        core.print_status(f"获取单个依赖信息时出错: {str(e)}", 'error')
-        return None
-
-# 异步更新依赖描述
-def async_update_descriptions(only_missing=True):
-    """
-    异步更新依赖描述（在后台线程中执行）
-    
-    该函数会访问PyPI API获取每个依赖的详细描述
-    
-    Args:
-        only_missing (bool): 如果为True，只更新缺少描述的依赖，否则更新所有依赖
-    """
-    try:
-        updated = False
-        missing_deps = []
-        
-        # 获取当前激活的Python环境路径
-        python_executable = core.get_active_python_executable()
-        
-        # 如果非only_missing模式 (环境已变更)，记录日志
-        if not only_missing:
-            core.print_status(f"环境切换后，将更新所有依赖的描述", 'info')
-        
-        # 创建一个临时脚本，用于获取依赖列表
-        script = """
-import sys
-import json
-try:
-    if sys.version_info < (3,8):
-        from importlib_metadata import distributions
-    else:
-        from importlib.metadata import distributions
-    
-    deps = []
-    for dist in distributions():
-        try:
-            pkg_name = dist.metadata['Name'].lower() if 'Name' in dist.metadata else dist.metadata.get('name', '').lower()
-            if not pkg_name:
-                continue
-            deps.append(pkg_name)
-        except Exception as e:
-            print(f"Error processing {dist}: {e}", file=sys.stderr)
-    
-    print(json.dumps(deps))
-except Exception as e:
-    print(f"Error: {e}", file=sys.stderr)
-    sys.exit(1)
-"""
-        # 创建临时文件
-        import tempfile
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False, encoding='utf-8') as temp_file:
-            temp_path = temp_file.name
-            temp_file.write(script)
-        
-        try:
-            # 执行脚本获取依赖列表
-            core.print_status(f"正在使用 {python_executable} 获取当前环境的依赖列表", 'info')
-            
-            result = subprocess.run(
-                [python_executable, temp_path],
-                capture_output=True, 
-                text=True
-            )
-            
-            if result.returncode != 0:
-                core.print_status(f"获取依赖失败: {result.stderr}", 'error')
-                return
-            
-            # 解析脚本输出获取所有依赖包名
-            package_list = json.loads(result.stdout.strip())
-            core.print_status(f"当前环境共有 {len(package_list)} 个依赖包", 'info')
-            
-            # 不论是否环境变更，始终只更新缺失的描述
-            # 统计缺失的依赖
-            current_keys = set(package_list)
-            old_keys = set(dependency_descriptions.keys())
-            missing_keys = current_keys - old_keys
-            
-            if missing_keys:
-                core.print_status(f"发现 {len(missing_keys)} 个需要获取描述的新包", 'info')
-                # 只把真正缺失描述的包添加到更新列表
-                missing_deps = list(missing_keys)
-            else:
-                core.print_status("当前环境中的所有依赖描述都已是最新状态", 'info')
-                
-                # 即使没有缺失的描述，当环境变更时也更新时间戳以触发前端刷新
-                if not only_missing:
-                    if not hasattr(sys.modules[__name__], 'last_description_update'):
-                        sys.modules[__name__].last_description_update = time.time()
-                    else:
-                        sys.modules[__name__].last_description_update = time.time()
-                    
-                return
-            
-        finally:
-            # 清理临时文件
-            try:
-                os.unlink(temp_path)
-            except:
-                pass
-        
-        # 如果有需要更新描述的依赖，打印日志
-        if missing_deps:
-            core.print_status(f"发现 {len(missing_deps)} 个需要更新描述的依赖，将在后台更新", 'info')
-            
-        # 获取需要更新的依赖的描述
-        for pkg_name in missing_deps:
-            try:
-                # 从PyPI获取依赖描述
-                response = requests.get(f"https://pypi.org/pypi/{pkg_name}/json", timeout=5)
-                if response.status_code == 200:
-                    data = response.json()
-                    description = data.get('info', {}).get('summary', "")
-                    dependency_descriptions[pkg_name] = description
-                    updated = True
-            except Exception as e:
-                core.print_status(f"更新 {pkg_name} 的描述时出错: {e}", 'warning')
-        
-        if updated:
-            core.print_status(f"已更新 {len(missing_deps)} 个依赖的描述", 'info')
-            save_descriptions()
-            # 标记更新时间戳，这个会被暴露给API模块使用
-            if not hasattr(sys.modules[__name__], 'last_description_update'):
-                sys.modules[__name__].last_description_update = time.time()
-            else:
-                sys.modules[__name__].last_description_update = time.time()
-        elif not missing_deps:
-            core.print_status("当前环境中的所有依赖描述都已是最新状态", 'info')
-    except Exception as e:
-        core.print_status(f"异步更新依赖描述时出错: {e}", 'error')
-
-# 获取所有已安装的依赖信息
-def get_all_dependencies(use_cache=True):
-    """
-    获取所有已安装的Python依赖信息
-    
-    Args:
-        use_cache (bool): 是否清除PyPI最新版本缓存。如果为False，将清除缓存，强制重新获取最新版本
-        
-    Returns:
-        list: 依赖信息列表
-    """
-    dependencies = []
-      # 如果不使用缓存，清理过期的PyPI版本缓存条目，而不是完全清空
-    if not use_cache:
-        global _pypi_version_cache
-        refresh_version_cache()
-    
-    # 不再使用缓存文件，直接使用字典保存处理过程中的信息
-    dependency_dict = {}
-    
-    # 获取当前激活的Python环境路径
-    python_executable = core.get_active_python_executable()
-    
-    # 使用subprocess直接调用指定的Python环境获取依赖列表
-    try:
-        # 创建一个临时脚本，用于获取依赖列表
-        script = """
-import sys
-import json
-try:
-    if sys.version_info < (3,8):
-        from importlib_metadata import distributions
-    else:
-        from importlib.metadata import distributions
-    
-    deps = []
-    for dist in distributions():
-        try:
-            pkg_name = dist.metadata['Name'].lower() if 'Name' in dist.metadata else dist.metadata.get('name', '').lower()
-            if not pkg_name:
-                continue
-            deps.append({
-                'name': pkg_name,
-                'version': dist.version
-            })
-        except Exception as e:
-            print(f"Error processing {dist}: {e}", file=sys.stderr)
-    
-    print(json.dumps(deps))
-except Exception as e:
-    print(f"Error: {e}", file=sys.stderr)
-    sys.exit(1)
-"""
-        # 创建临时文件
-        import tempfile
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False, encoding='utf-8') as temp_file:
-            temp_path = temp_file.name
-            temp_file.write(script)
-        
-        try:
-            # 执行脚本获取依赖列表
-            result = subprocess.run(
-                [python_executable, temp_path],
-                capture_output=True, 
-                text=True
-            )
-            
-            if result.returncode != 0:
-                core.print_status(f"获取依赖失败: {result.stderr}", 'error')
-                return []
-            
-            # 解析脚本输出
-            deps_data = json.loads(result.stdout.strip())
-            
-            # 处理依赖数据
-            for dep_info in deps_data:
-                pkg_name = dep_info['name']
-                pkg_version = dep_info['version']
-                  # 如果该包名已存在，检查版本并保留更新的版本
-                if pkg_name in dependency_dict:
-                    existing_version = dependency_dict[pkg_name]['version']
-                    current_version = pkg_version
-                    
-                    try:
-                        # 比较版本，保留更高的版本
-                        existing_ver = version.parse(existing_version)
-                        current_ver = version.parse(current_version)
-                        
-                        # 如果当前版本更低，跳过
-                        if current_ver <= existing_ver:
-                            continue
-                    except Exception as e:
-                        core.print_status(f"版本比较出错 {pkg_name}: {e}", 'warning')
-                        # 出错时默认保留已有版本
-                        continue
-                
-                is_system = pkg_name in SYSTEM_DEPENDENCIES
-                is_core = pkg_name in CORE_DEPENDENCIES
-                is_ai_model = pkg_name in AI_MODEL_DEPENDENCIES
-                is_app_required = pkg_name in APP_DEPENDENCIES
-                description = dependency_descriptions.get(pkg_name, "")
-                
-                # 实时获取最新版本信息（在PyPI上查询）
-                latest_version = ""
-                is_latest = False
-                
-                try:
-                    # 只对非系统和非应用依赖进行版本检查
-                    if not is_system and not is_app_required:
-                        pypi_info = get_latest_version_from_pypi(pkg_name)
-                        if pypi_info.get('version'):
-                            latest_version = pypi_info['version']
-                            
-                            # 直接使用标准化的版本比较函数
-                            norm_current = normalize_version(pkg_version)
-                            norm_latest = normalize_version(latest_version)
-                            is_latest = (norm_current == norm_latest)
-                            
-                            # 如果标准化版本不相等，使用精确的版本比较
-                            if not is_latest:
-                                try:
-                                    current_ver = version.parse(pkg_version)
-                                    latest_ver = version.parse(latest_version)
-                                    is_latest = (current_ver >= latest_ver)
-                                except Exception:
-                                    # 如果精确比较失败，使用简化比较
-                                    is_latest = (pkg_version == latest_version)
-                except Exception as e:
-                    core.print_status(f"获取{pkg_name}的最新版本信息失败: {e}", 'warning')
-                    # 出错时默认为非最新版本
-                    is_latest = False
-                
-                # 存储依赖信息到字典中，以防止重复
-                dependency_dict[pkg_name] = {
-                    'name': pkg_name,
-                    'version': pkg_version,
-                    'description': description,
-                    'isSystem': is_system,
-                    'isCore': is_core,
-                    'isAIModel': is_ai_model,
-                    'isAppRequired': is_app_required,
-                    'isLatest': is_latest,
-                    'latestVersion': latest_version
-                }
-                
-        finally:
-            # 清理临时文件
-            try:
-                os.unlink(temp_path)
-            except:
-                pass
-    except Exception as e:
-        core.print_status(f"获取依赖列表失败: {e}", 'error')
-        return []
-    
-    # 将字典值转换为列表
-    dependencies = list(dependency_dict.values())
-    
-    return dependencies
-
-# PyPI版本信息缓存，避免重复请求，添加时间戳
-_pypi_version_cache = {}
-
-# 基于时间的缓存刷新
-def refresh_version_cache(force_refresh=False):
-    """
-    基于时间刷新PyPI版本缓存
-    
-    清理过期的PyPI版本缓存条目，而不是完全清空缓存
-    
-    Args:
-        force_refresh (bool): 如果为True，则强制刷新所有缓存
-    """
-    global _pypi_version_cache
-    import time
-    
-    # 计算过期时间 (24小时)
-    current_time = time.time()
-    expire_time = current_time - (24 * 60 * 60)
-    
-    if force_refresh:
-        # 强制刷新模式下，清空所有缓存
-        _pypi_version_cache = {}
-        return
-    
-    # 查找并移除过期的缓存条目
-    expired_keys = []
-    for pkg_name, pkg_data in _pypi_version_cache.items():
-        if 'timestamp' not in pkg_data or pkg_data['timestamp'] < expire_time:
-            expired_keys.append(pkg_name)
-    
-    # 从缓存中移除过期条目
-    for key in expired_keys:
-        _pypi_version_cache.pop(key, None)
-      # 如果有条目被移除，输出日志
-    if expired_keys:
-        core.print_status(f"已清理 {len(expired_keys)} 个过期的PyPI版本缓存条目", 'info')
-
-def get_latest_version_from_pypi(package_name, force_refresh=False):
-    """
-    从PyPI获取包的最新版本信息，使用带时间戳的缓存
-    
-    Args:
-        package_name (str): 包名
-        force_refresh (bool): 是否强制刷新，忽略缓存
-    
-    Returns:
-        dict: 包含版本信息的字典
-    """
-    import time
-    current_time = time.time()
-    
-    # 检查缓存是否有效（24小时内）
-    if not force_refresh and package_name in _pypi_version_cache:
-        cache_entry = _pypi_version_cache[package_name]
-        # 检查时间戳是否存在且未过期
-        if 'timestamp' in cache_entry and current_time - cache_entry['timestamp'] < 24 * 60 * 60:
-            return cache_entry
-    
-    try:
-        url = f"https://pypi.org/pypi/{package_name}/json"
-        response = requests.get(url, timeout=5)
-        if response.status_code == 200:
-            data = response.json()
-            version_info = {
-                'version': data.get('info', {}).get('version', ''),
-                'releases': data.get('releases', {}),
-                'timestamp': current_time  # 添加时间戳
-            }
-            _pypi_version_cache[package_name] = version_info
-            return version_info
-        else:
-            return {'version': '', 'timestamp': current_time}
-    except Exception as e:
-        core.print_status(f"获取{package_name}的PyPI信息失败: {e}", 'warning')
-        return {'version': '', 'timestamp': current_time}
-
-# 版本标准化函数
-def normalize_version(version_str):
-    """
-    标准化版本字符串，移除后缀，便于比较
-    
-    Args:
-        version_str (str): 版本字符串
-    
-    Returns:
-        str: 标准化后的版本字符串
-    """
-    if not version_str:
-        return ""
-    
-    # 移除常见后缀
-    version_str = str(version_str)
-    
-    # 移除.postX后缀
-    if '.post' in version_str:
-        version_str = version_str.split('.post')[0]
-    
-    # 移除预发布标识
-    for prefix in ['a', 'b', 'rc', 'dev', 'alpha', 'beta', 'pre']:
-        if f'.{prefix}' in version_str:
-            version_str = version_str.split(f'.{prefix}')[0]
-        if f'-{prefix}' in version_str:
-            version_str = version_str.split(f'-{prefix}')[0]
-    
-    return version_str
-
-# 卸载依赖
-def uninstall_dependency(dependency):
-    """
-    卸载单个依赖
-    
-    Args:
-        dependency (str): 依赖名称
-        
-    Returns:
-        tuple: (success, message) 元组
-    """
-    try:
-        # 检查是否是系统依赖或应用依赖
-        if dependency.lower() in SYSTEM_DEPENDENCIES:
-            return False, f'{dependency} 是系统依赖，不能卸载'
-        
-        if dependency.lower() in APP_DEPENDENCIES:
-            return False, f'{dependency} 是软件运行依赖，不能卸载'
-        
-        # 检查依赖是否存在，避免卸载不存在的依赖时返回成功
-        installed = False
-        for dist in distributions():
-            pkg_name = dist.metadata['Name'].lower() if 'Name' in dist.metadata else dist.metadata.get('name', '').lower()
-            if pkg_name == dependency.lower():
-                installed = True
-                break
-                
-        if not installed:
-            return False, f'{dependency} 未安装或已被卸载'
-        
-        core.print_status(f"正在卸载 {dependency}...", 'start')
-        
-        # 使用当前活动环境的Python
-        python_executable = core.get_active_python_executable()
-        
-        # 执行卸载命令
-        process = subprocess.run(
-            [python_executable, '-m', 'pip', 'uninstall', '-y', dependency],
-            capture_output=True, 
-            text=True
-        )
-        
-        # 检查返回状态
-        if process.returncode != 0:
-            error_message = process.stderr or "卸载失败，但没有详细错误信息"
-            core.print_status(f"卸载 {dependency} 失败: {error_message}", 'error')
-            return False, f'卸载失败: {error_message}'
-        
-        core.print_status(f"成功卸载 {dependency}", 'success')
-        return True, f'成功卸载: {dependency}'
-    except Exception as e:
-        core.print_status(f"卸载 {dependency} 过程中出错: {str(e)}", 'error')
-        return False, f'卸载过程中出错: {str(e)}'
-
-# 更新依赖
-def update_dependency(dependency, task_id):
-    """
-    更新依赖到最新版本
-    
-    Args:
-        dependency (str): 依赖名称
-        task_id (str): 任务ID
-        
-    Returns:
-        bool: 是否成功
-    """
-    try:
-        core.update_task_progress(task_id, 10, f'开始更新 {dependency}...')
-        
-        # 更新依赖
-        core.print_status(f"正在更新 {dependency} 到最新版本...", 'start')
-        
-        # 使用当前活动环境的Python
-        python_executable = core.get_active_python_executable()
-        
-        # 使用流式处理函数处理命令输出
-        cmd = [python_executable, '-m', 'pip', 'install', '--upgrade', dependency]
-        success = core.stream_process_output(cmd, task_id, dependency)
-        
-        if not success:
-            core.print_status(f"更新 {dependency} 失败", 'error')
-            core.update_task_progress(task_id, 100, f'更新 {dependency} 失败')
-            return False
-        
-        core.print_status(f"成功更新 {dependency} 到最新版本", 'success')
-        core.update_task_progress(task_id, 100, f'成功更新 {dependency}')
-        return True
-    except Exception as e:
-        core.print_status(f"更新 {dependency} 时发生错误: {str(e)}", 'error')
-        return False
-
-# 切换版本
-def switch_version(package, version, task_id):
-    """
-    切换依赖版本
-    
-    Args:
-        package (str): 包名称
-        version (str): 目标版本
-        task_id (str): 任务ID
-        
-    Returns:
-        bool: 是否成功
-    """
-    try:
-        core.update_task_progress(task_id, 10, f'开始将 {package} 切换到版本 {version}...')
-        
-        # 切换版本
-        core.print_status(f"正在将 {package} 切换到版本 {version}...", 'start')
-        
-        # 使用当前活动环境的Python
-        python_executable = core.get_active_python_executable()
-        
-        # 使用流式处理函数处理命令输出
-        cmd = [python_executable, '-m', 'pip', 'install', f'{package}=={version}', '--force-reinstall']
-        success = core.stream_process_output(cmd, task_id, package)
-        
-        if not success:
-            core.print_status(f"切换 {package} 到版本 {version} 失败", 'error')
-            core.update_task_progress(task_id, 100, f'切换 {package} 到版本 {version} 失败')
-            return False
-        
-        core.print_status(f"成功将 {package} 切换到版本 {version}", 'success')
-        core.update_task_progress(task_id, 100, f'成功将 {package} 切换到版本 {version}')
-        return True
-    except Exception as e:
-        core.print_status(f"切换版本时发生错误: {str(e)}", 'error')
-        return False
-
-# 批量卸载
-def batch_uninstall(packages, task_id):
-    """
-    批量卸载多个依赖
-    
-    Args:
-        packages (list): 依赖名称列表
-        task_id (str): 任务ID
-    
-    Returns:
-        bool: 是否全部成功
-    """
-    # 使用通用批量处理功能
-    errors = []
-    total = len(packages)
-    
-    for index, pkg in enumerate(packages):
-        try:
-            # 检查是否是系统依赖或应用依赖
-            if pkg.lower() in SYSTEM_DEPENDENCIES or pkg.lower() in APP_DEPENDENCIES:
-                errors.append(f"{pkg}: 系统或软件依赖不能卸载")
-                continue
-            
-            # 更新进度
-            core.update_task_progress(
-                task_id, 
-                index + 1, 
-                f'卸载 {pkg} ({index + 1}/{total})'
-            )
-            
-            # 执行卸载
-            success, message = uninstall_dependency(pkg)
-            if not success:
-                errors.append(f"{pkg}: {message}")
-            
-        except Exception as e:
-            errors.append(f"{pkg}: {str(e)}")
-    
-    # 完成任务
-    core.complete_task(task_id, errors)
-    
-    # 如果有错误，则返回失败
-    return len(errors) == 0
-
-# 批量更新
-def batch_update(packages, task_id):
-    """
-    批量更新多个依赖
-    
-    Args:
-        packages (list): 依赖名称列表
-        task_id (str): 任务ID
-    
-    Returns:
-        bool: 是否全部成功
-    """
-    errors = []
-    total = len(packages)
-    
-    for index, pkg in enumerate(packages):
-        try:
-            # 更新进度
-            core.update_task_progress(
-                task_id, 
-                index + 1, 
-                f'更新 {pkg} ({index + 1}/{total})'
-            )
-            
-            # 执行更新
-            success = update_dependency(pkg, task_id)
-            if not success:
-                errors.append(f"{pkg}: 更新失败")
-            
-        except Exception as e:
-            errors.append(f"{pkg}: {str(e)}")
-    
-    # 完成任务
-    core.complete_task(task_id, errors)
-    
-    # 如果有错误，则返回失败
-    return len(errors) == 0
-
-# 安装依赖
-def install_dependency(package_name):
-    """
-    安装单个依赖
-    
-    Args:
-        package_name (str): 包名称
-    
-    Returns:
-        tuple: (success, message) 元组
-    """
-    try:
-        core.print_status(f"正在安装 {package_name}...", 'start')
-        # 使用当前活动环境的Python
-        python_executable = core.get_active_python_executable()
-        
-        # 使用subprocess.run而不是check_call，这样可以捕获输出和返回码
-        result = subprocess.run(
-            [python_executable, '-m', 'pip', 'install', package_name],
-            capture_output=True,
-            text=True
-        )
-        
-        # 检查命令执行结果
-        if result.returncode == 0:
-            core.print_status(f"成功安装 {package_name}", 'success')
-            return True, f'成功安装: {package_name}'
-        else:
-            # 返回pip命令的错误信息
-            error_message = result.stderr.strip() or '未知错误'
-            core.print_status(f"安装 {package_name} 失败: {error_message}", 'error')
-            return False, f'安装失败: {error_message}'
-            
-    except Exception as e:
-        core.print_status(f"处理安装请求时出错: {str(e)}", 'error')
-        return False, f'安装失败: {str(e)}'
-
-# 安装wheel文件
-def install_whl(file_path, task_id):
-    """
-    安装wheel文件
-    
-    Args:
-        file_path (str): wheel文件路径
-        task_id (str): 任务ID
-    
-    Returns:
-        bool: 是否成功
-    """
-    file_name = os.path.basename(file_path)
-    
-    try:
-        core.update_task_progress(task_id, 10, f'准备安装 {file_name}...')
-        core.print_status(f"正在安装wheel文件: {file_name}", 'start')
-        
-        # 使用当前活动环境的Python
-        python_executable = core.get_active_python_executable()
-        
-        # 使用流式处理输出
-        cmd = [python_executable, '-m', 'pip', 'install', file_path]
-        success = core.stream_process_output(cmd, task_id, file_name)
-        
-        if not success:
-            core.print_status(f"安装 {file_name} 失败", 'error')
-            core.update_task_progress(task_id, 100, f'安装 {file_name} 失败')
-            return False
-        
-        core.print_status(f"成功安装 {file_name}", 'success')
-        core.update_task_progress(task_id, 100, f'成功安装 {file_name}')
-        return True
-    except Exception as e:
-        core.print_status(f"安装 {file_name} 时发生错误: {str(e)}", 'error')
-        return False
-
-# 安装requirements文件
-def install_requirements(file_path, task_id):
-    """
-    安装requirements.txt文件
-    
-    Args:
-        file_path (str): requirements文件路径
-        task_id (str): 任务ID
-    
-    Returns:
-        bool: 是否成功
-    """
-    file_name = os.path.basename(file_path)
-    
-    try:
-        core.update_task_progress(task_id, 0, '正在读取requirements.txt文件...')
-        core.print_status(f"正在读取文件 {file_name}...", 'start')
-        
-        # 读取requirements文件
-        with open(file_path, 'r') as f:
-            requirements = [line.strip() for line in f.readlines() if line.strip() and not line.strip().startswith('#')]
-        
-        if not requirements:
-            core.update_task_progress(task_id, 100, '没有找到有效的包，文件可能为空')
-            core.print_status(f"文件 {file_name} 为空或只包含注释", 'warning')
-            core.complete_task(task_id, [{"package": file_name, "error": "文件为空或只包含注释"}])
-            return False
-            
-        core.update_task_progress(task_id, 10, f'找到 {len(requirements)} 个包需要安装')
-        core.print_status(f"找到 {len(requirements)} 个依赖需要安装", 'info')
-        
-        # 使用当前活动环境的Python
-        python_executable = core.get_active_python_executable()
-        
-        # 使用pip直接安装requirements.txt文件，使用流式处理
-        cmd = [python_executable, '-m', 'pip', 'install', '-r', file_path]
-        success = core.stream_process_output(cmd, task_id, "requirements.txt")
-        
-        if not success:
-            core.print_status(f"安装requirements.txt失败", 'error')
-            return False
-        
-        core.print_status("成功安装requirements.txt中的依赖", 'success')
-        return True
-    except Exception as e:
-        core.print_status(f"处理文件 {file_name} 时出错: {str(e)}", 'error')
-        return False
-
-# 清理PIP缓存
-def clean_pip_cache(task_id):
-    """
-    清理PIP缓存
-    
-    Args:
-        task_id (str): 任务ID
-    
-    Returns:
-        bool: 是否成功
-    """
-    try:
-        core.update_task_progress(task_id, 10, '开始清理PIP缓存...')
-        core.print_status("开始清理PIP缓存...", 'start')
-        
-        # 使用当前活动环境的Python
-        python_executable = core.get_active_python_executable()
-        
-        # 执行pip cache purge命令清理缓存
-        core.update_task_progress(task_id, 50, '正在清理PIP缓存...')
-        result = subprocess.run(
-            [python_executable, '-m', 'pip', 'cache', 'purge'],
-            capture_output=True,
-            text=True
-        )
-        
-        if result.returncode != 0:
-            core.print_status(f"清理PIP缓存失败: {result.stderr}", 'error')
-            core.update_task_progress(task_id, 100, '清理缓存失败')
-            core.complete_task(task_id, [f"清理缓存失败: {result.stderr}"])
-            return False
-        
-        core.print_status("PIP缓存清理完成", 'success')
-        core.update_task_progress(task_id, 100, '缓存清理完成')
-        core.complete_task(task_id, [])
-        return True
-    except Exception as e:
-        core.print_status(f"清理缓存出错: {str(e)}", 'error')
-        core.complete_task(task_id, [f"清理缓存出错: {str(e)}"])
-        return False
-
-# 全局变量用于检测循环依赖
-_visited_packages = set()
-
-def get_dependency_graph(package_name, max_depth=2, include_dev=False):
-    """
-    获取依赖关系图数据
-    
-    Args:
-        package_name (str): 包名称
-        max_depth (int): 最大依赖深度
-        include_dev (bool): 是否包括开发依赖
-        
-    Returns:
-        dict: 包含nodes和links的图形数据
-    """
-    # 重置访问记录
-    global _visited_packages
-    _visited_packages = set()
-    
-    # 初始化图形数据结构
-    graph_data = {
-        "nodes": [],
-        "links": []
-    }
-    
-    try:
-        # 检查包是否已安装
-        if not is_package_installed(package_name):
-            return {
-                "nodes": [{
-                    "id": package_name,
-                    "name": package_name,
-                    "version": "未安装",
-                    "type": "main",
-                    "description": "包未安装"
-                }],
-                "links": []
-            }
-        
-        # 获取主包信息
-        main_package_info = get_package_info(package_name)
-        if not main_package_info:
-            return {
-                "nodes": [{
-                    "id": package_name,
-                    "name": package_name,
-                    "version": "未知",
-                    "type": "main",
-                    "description": "无法获取包信息"
-                }],
-                "links": []
-            }
-        
-        # 添加主包节点
-        graph_data["nodes"].append({
-            "id": package_name,
-            "name": package_name,
-            "version": main_package_info.get("version", "未知"),
-            "type": "main",
-            "description": main_package_info.get("summary", "无描述")
-        })
-        
-        # 标记主包为已访问
-        _visited_packages.add(package_name)
-        
-        # 递归构建依赖树
-        build_dependency_tree(
-            package_name, 
-            graph_data, 
-            current_depth=0, 
-            max_depth=max_depth,
-            include_dev=include_dev
-        )
-        
-        return graph_data
-        
-    except Exception as e:
-        print(f"获取依赖关系图失败: {str(e)}")
-        # 返回包含错误信息的最小图
-        return {
-            "nodes": [{
-                "id": package_name,
-                "name": package_name,
-                "version": "错误",
-                "type": "main",
-                "description": f"获取依赖关系图失败: {str(e)}"
-            }],
-            "links": []
-        }
-
-def build_dependency_tree(package_name, graph_data, current_depth=0, max_depth=2, include_dev=False):
-    """
-    递归构建依赖树
-    
-    Args:
-        package_name (str): 包名称
-        graph_data (dict): 图形数据
-        current_depth (int): 当前深度
-        max_depth (int): 最大深度
-        include_dev (bool): 是否包括开发依赖
-    """
-    # 防止超出最大深度
-    if current_depth >= max_depth:
-        return
-    
-    # 获取包的依赖信息
-    dependencies = get_package_dependencies(package_name)
-    
-    # 处理依赖
-    for dep_name, dep_info in dependencies.items():
-        # 跳过已处理的依赖，避免循环
-        if dep_name in _visited_packages:
-            continue
-        
-        # 检查是否需要包含开发依赖
-        if not include_dev and dep_info.get("dev_dependency", False):
-            continue
-            
-        # 标记为已访问
-        _visited_packages.add(dep_name)
-        
-        # 获取详细的包信息
-        package_info = get_package_info(dep_name)
-        
-        # 确定节点类型
-        node_type = "direct"
-        if dep_info.get("optional", False):
-            node_type = "optional"
-            
-        # 添加节点
-        graph_data["nodes"].append({
-            "id": dep_name,
-            "name": dep_name,
-            "version": package_info.get("version", "未知") if package_info else "未知",
-            "type": node_type,
-            "description": package_info.get("summary", "无描述") if package_info else "无描述"
-        })
-        
-        # 添加链接
-        graph_data["links"].append({
-            "source": package_name,
-            "target": dep_name,
-            "type": "optional" if dep_info.get("optional", False) else "required"
-        })
-        
-        # 递归处理子依赖
-        build_dependency_tree(
-            dep_name,
-            graph_data,
-            current_depth + 1,
-            max_depth,
-            include_dev
-        )
-
-def get_package_dependencies(package_name):
-    """
-    获取包的依赖信息
-    
-    Args:
-        package_name (str): 包名称
-        
-    Returns:
-        dict: 依赖信息字典
-    """
-    dependencies = {}
-    
-    try:
-        # 使用pip show命令获取包信息
-        result = subprocess.run(
-            [sys.executable, "-m", "pip", "show", package_name],
-            capture_output=True,
-            text=True,
-            check=False  # 不抛出异常，以便处理错误
-        )
-        
-        if result.returncode != 0:
-            print(f"无法获取包 {package_name} 的信息: {result.stderr}")
-            return {}
-        
-        # 解析输出
-        output = result.stdout
-        
-        # 提取依赖信息
-        requires_section = re.search(r"Requires: (.+)", output)
-        if requires_section:
-            requires_str = requires_section.group(1).strip()
-            if requires_str and requires_str != "none":
-                for dep in requires_str.split(', '):
-                    dep = dep.strip()
-                    if dep:
-                        # 检查是否为可选依赖（有额外标记）
-                        optional = "[" in dep or ";" in dep
-                        
-                        # 提取基本包名
-                        base_name = dep.split('[')[0].split(';')[0].split('=')[0].split('>')[0].split('<')[0].strip()
-                        
-                        dependencies[base_name] = {
-                            "optional": optional,
-                            "dev_dependency": False,  # pip show不区分开发依赖
-                            "raw_requirement": dep
-                        }
-        
-        # 尝试从setup.py或pyproject.toml获取更详细的依赖信息
-        # 注意：这需要实际访问包的源代码或安装目录
-        # 此处省略实现，实际应用中可能需要更复杂的逻辑
-                
-        return dependencies
-        
-    except Exception as e:
-        print(f"获取包 {package_name} 的依赖信息失败: {str(e)}")
-        return {}
-
-def get_package_info(package_name):
-    """
-    获取包的详细信息
-    
-    Args:
-        package_name (str): 包名称
-        
-    Returns:
-        dict: 包信息字典
-    """
-    try:
-        # 使用pip show命令获取包信息
-        result = subprocess.run(
-            [sys.executable, "-m", "pip", "show", package_name],
-            capture_output=True,
-            text=True,
-            check=False
-        )
-        
-        if result.returncode != 0:
-            print(f"无法获取包 {package_name} 的信息: {result.stderr}")
-            return None
-        
-        # 解析输出
-        output = result.stdout
-        info = {}
-        
-        # 提取基本信息
-        name_match = re.search(r"Name: (.+)", output)
-        version_match = re.search(r"Version: (.+)", output)
-        summary_match = re.search(r"Summary: (.+)", output)
-        
-        if name_match:
-            info["name"] = name_match.group(1).strip()
-        if version_match:
-            info["version"] = version_match.group(1).strip()
-        if summary_match:
-            info["summary"] = summary_match.group(1).strip()
-        
-        return info
-        
-    except Exception as e:
-        print(f"获取包 {package_name} 的信息失败: {str(e)}")
-        return None
-
-def is_package_installed(package_name):
-    """
-    检查包是否已安装
-    
-    Args:
-        package_name (str): 包名称
-        
-    Returns:
-        bool: 是否已安装
-    """
-    try:
-        # 使用pip list命令检查包是否已安装
-        result = subprocess.run(
-            [sys.executable, "-m", "pip", "list"],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        
-        # 解析输出，查找包名
-        pattern = r"(?:^|\n)" + re.escape(package_name) + r"\s+"
-        return bool(re.search(pattern, result.stdout, re.IGNORECASE))
-        
-    except Exception as e:
-        print(f"检查包 {package_name} 是否已安装失败: {str(e)}")
-        return False
-
-# 获取单个依赖的详细信息
-def get_single_dependency_info(package_name, force_refresh=False):
-    """
-    获取单个依赖的详细信息，支持增量刷新
-    
-    当执行单个包的操作（安装、卸载、更新）后，可以使用此函数仅刷新该包的信息，
-    而不是重新获取所有依赖的列表。
-    
-    Args:
-        package_name (str): 包名
-        force_refresh (bool): 是否强制刷新PyPI版本缓存
-        
-    Returns:
-        dict: 依赖信息字典，如果包不存在则返回None
-    """
-    # 获取当前激活的Python环境路径
-    python_executable = core.get_active_python_executable()
-    
-    # 检查包是否已安装
-    try:
-        # 创建一个临时脚本，用于获取包信息
-        script = """
-import sys
-import json
-try:
-    if sys.version_info < (3,8):
-        from importlib_metadata import distributions
-    else:
-        from importlib.metadata import distributions
-    
-    package_name = sys.argv[1].lower()
-    package_info = None
-    
-    for dist in distributions():
-        try:
-            pkg_name = dist.metadata['Name'].lower() if 'Name' in dist.metadata else dist.metadata.get('name', '').lower()
-            if pkg_name == package_name:
-                package_info = {
-                    'name': pkg_name,
-                    'version': dist.version
-                }
-                break
-        except Exception as e:
-            print(f"Error processing {dist}: {e}", file=sys.stderr)
-    
-    print(json.dumps(package_info))
-except Exception as e:
-    print(f"Error: {e}", file=sys.stderr)
-    sys.exit(1)
-"""
-        # 创建临时文件
-        import tempfile
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False, encoding='utf-8') as temp_file:
-            temp_path = temp_file.name
-            temp_file.write(script)
-        
-        try:
-            # 执行脚本获取包信息
-            result = subprocess.run(
-                [python_executable, temp_path, package_name],
-                capture_output=True, 
-                text=True
-            )
-            
-            if result.returncode != 0:
-                core.print_status(f"获取依赖 {package_name} 信息失败: {result.stderr}", 'error')
-                return None
-            
-            # 解析脚本输出
-            package_data = json.loads(result.stdout.strip())
-            if not package_data:
-                # 包未安装
-                return None
-            
-            # 设置包的其他属性
-            pkg_name = package_data['name']
-            pkg_version = package_data['version']
-            
-            is_system = pkg_name in SYSTEM_DEPENDENCIES
-            is_core = pkg_name in CORE_DEPENDENCIES
-            is_ai_model = pkg_name in AI_MODEL_DEPENDENCIES
-            is_app_required = pkg_name in APP_DEPENDENCIES
-            
-            # 获取包描述
-            description = dependency_descriptions.get(pkg_name, "")
-            if not description:
-                # 如果没有描述，尝试从PyPI获取
-                try:
-                    response = requests.get(f"https://pypi.org/pypi/{pkg_name}/json", timeout=5)
-                    if response.status_code == 200:
-                        data = response.json()
-                        description = data.get('info', {}).get('summary', "")
-                        dependency_descriptions[pkg_name] = description
-                        save_descriptions()
-                except Exception as e:
-                    core.print_status(f"获取 {pkg_name} 描述失败: {e}", 'warning')
-            
-            # 获取最新版本信息，可选强制刷新
-            latest_version = ""
-            is_latest = False
-            
-            try:
-                if not is_system and not is_app_required:
-                    pypi_info = get_latest_version_from_pypi(pkg_name, force_refresh)
-                    if pypi_info.get('version'):
-                        latest_version = pypi_info['version']
-                        
-                        # 版本比较
-                        norm_current = normalize_version(pkg_version)
-                        norm_latest = normalize_version(latest_version)
-                        is_latest = (norm_current == norm_latest)
-                        
-                        if not is_latest:
-                            try:
-                                current_ver = version.parse(pkg_version)
-                                latest_ver = version.parse(latest_version)
-                                is_latest = (current_ver >= latest_ver)
-                            except Exception:
-                                is_latest = (pkg_version == latest_version)
-            except Exception as e:
-                core.print_status(f"获取 {pkg_name} 的最新版本信息失败: {e}", 'warning')
-                is_latest = False
-            
-            # 返回完整的依赖信息
-            return {
-                'name': pkg_name,
-                'version': pkg_version,
-                'description': description,
-                'isSystem': is_system,
-                'isCore': is_core, 
-                'isAIModel': is_ai_model,
-                'isAppRequired': is_app_required,
-                'isLatest': is_latest,
-                'latestVersion': latest_version
-            }
-                
-        finally:
-            # 清理临时文件
-            try:
-                os.unlink(temp_path)
-            except:
-                pass
-    except Exception as e:
-        core.print_status(f"获取依赖 {package_name} 信息失败: {e}", 'error')
-        return None
-    
-    return None
-
-# 加载缓存的描述信息
-load_descriptions()
+"""
+依赖管理模块 - 处理与Python包依赖相关的功能
+
+此模块负责：
+- 获取已安装的Python依赖信息
+- 分类和处理依赖数据
+- 提供依赖安装、卸载、更新和版本切换功能
+- 处理批量操作和任务管理
+"""
+
+import os
+import sys
+import json
+import time
+import subprocess
+import threading
+import functools
+import queue
+from packaging import version
+from packaging.utils import parse_wheel_filename, parse_sdist_filename
+from packaging.requirements import Requirement
+from concurrent.futures import ThreadPoolExecutor
+
+# 尝试导入orjson加速JSON序列化，不可用时回退到标准json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _json_loads(data):
+    """反序列化JSON字节/字符串，优先用orjson（解码快2-6倍）"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# 共享HTTP会话 - 懒初始化，首次访问PyPI时才导入requests（及其urllib3/certifi链），
+# 不访问网络的启动路径省掉约100ms的模块导入开销
+_session = None
+_session_init_lock = threading.Lock()
+
+def _get_session():
+    """获取共享HTTP会话，连接池复用TCP+TLS连接，批量查询PyPI时省去逐请求握手"""
+    global _session
+    if _session is None:
+        with _session_init_lock:
+            if _session is None:
+                import requests
+
+                # brotli比gzip对JSON再小约20%；未安装brotli解码器时只声明gzip，
+                # 避免收到解不开的响应
+                try:
+                    import brotli  # noqa: F401
+                    accept_encoding = 'gzip, br'
+                except ImportError:
+                    accept_encoding = 'gzip'
+
+                session = requests.Session()
+                session.headers.update({'Accept-Encoding': accept_encoding,
+                                        'User-Agent': 'ModuWeb-EasyPyEnv'})
+                session.mount('https://', requests.adapters.HTTPAdapter(
+                    pool_connections=32,
+                    pool_maxsize=32,
+                    max_retries=requests.adapters.Retry(
+                        total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]
+                    )
+                ))
+                _session = session
+    return _session
+
+if sys.version_info < (3,8):
+    from importlib_metadata import distributions, distribution, PackageNotFoundError
+else:
+    from importlib.metadata import distributions, distribution, PackageNotFoundError
+
+# 在目标环境解释器内执行的辅助脚本，通过 python -c 直接传入，
+# 免去每次调用的临时文件创建/删除以及清理失败的残留风险
+
+# 列出所有已安装包名（小写）
+_LIST_DEP_NAMES_SCRIPT = """
+import sys
+import json
+try:
+    if sys.version_info < (3,8):
+        from importlib_metadata import distributions
+    else:
+        from importlib.metadata import distributions
+
+    deps = []
+    for dist in distributions():
+        try:
+            name = dist.metadata['Name']
+            pkg_name = name.lower() if name else ''
+            if not pkg_name:
+                continue
+            deps.append(pkg_name)
+        except Exception as e:
+            print(f"Error processing {dist}: {e}", file=sys.stderr)
+
+    print(json.dumps(deps))
+except Exception as e:
+    print(f"Error: {e}", file=sys.stderr)
+    sys.exit(1)
+"""
+
+# 列出所有已安装包的名称和版本
+_LIST_DEPS_SCRIPT = """
+import sys
+import json
+try:
+    if sys.version_info < (3,8):
+        from importlib_metadata import distributions
+    else:
+        from importlib.metadata import distributions
+
+    deps = []
+    for dist in distributions():
+        try:
+            name = dist.metadata['Name']
+            pkg_name = name.lower() if name else ''
+            if not pkg_name:
+                continue
+            deps.append({
+                'name': pkg_name,
+                'version': dist.version
+            })
+        except Exception as e:
+            print(f"Error processing {dist}: {e}", file=sys.stderr)
+
+    print(json.dumps(deps))
+except Exception as e:
+    print(f"Error: {e}", file=sys.stderr)
+    sys.exit(1)
+"""
+
+# 查询单个包（包名经argv传入）的名称和版本
+_QUERY_PACKAGE_SCRIPT = """
+import sys
+import json
+try:
+    if sys.version_info < (3,8):
+        from importlib_metadata import distributions
+    else:
+        from importlib.metadata import distributions
+
+    package_name = sys.argv[1].lower()
+    package_info = None
+
+    for dist in distributions():
+        try:
+            name = dist.metadata['Name']
+            pkg_name = name.lower() if name else ''
+            if pkg_name == package_name:
+                package_info = {
+                    'name': pkg_name,
+                    'version': dist.version
+                }
+                break
+        except Exception as e:
+            print(f"Error processing {dist}: {e}", file=sys.stderr)
+
+    print(json.dumps(package_info))
+except Exception as e:
+    print(f"Error: {e}", file=sys.stderr)
+    sys.exit(1)
+"""
+
+# 常驻辅助解释器的命令循环：逐行读取命令，逐行写回JSON响应
+_HELPER_LOOP_SCRIPT = """
+import sys
+import json
+
+if sys.version_info < (3,8):
+    from importlib_metadata import distributions
+else:
+    from importlib.metadata import distributions
+
+def _pairs():
+    out = []
+    for dist in distributions():
+        try:
+            name = dist.metadata['Name']
+            if name:
+                out.append((name.lower(), dist.version))
+        except Exception:
+            continue
+    return out
+
+for line in sys.stdin:
+    cmd = line.strip()
+    if cmd == 'EXIT':
+        break
+    try:
+        if cmd == 'LIST_DEPS':
+            result = [{'name': n, 'version': v} for n, v in _pairs()]
+        elif cmd == 'LIST_NAMES':
+            result = [n for n, _ in _pairs()]
+        elif cmd.startswith('QUERY '):
+            target = cmd[6:].strip().lower()
+            result = None
+            for n, v in _pairs():
+                if n == target:
+                    result = {'name': n, 'version': v}
+                    break
+        else:
+            result = None
+    except Exception:
+        result = None
+    sys.stdout.write(json.dumps(result) + '\\n')
+    sys.stdout.flush()
+"""
+
+# 导入自定义模块
+from . import core
+
+# 从core模块导入配置数据
+SYSTEM_DEPENDENCIES = core.SYSTEM_DEPENDENCIES
+CORE_DEPENDENCIES = core.CORE_DEPENDENCIES
+AI_MODEL_DEPENDENCIES = core.AI_MODEL_DEPENDENCIES
+APP_DEPENDENCIES = core.APP_DEPENDENCIES
+CONFIG_DIR = core.CONFIG_DIR
+
+# 依赖描述缓存
+dependency_descriptions = {}
+
+# 描述获取失败（PyPI上查不到等）的负缓存：包名 -> 失败时间戳
+# TTL内不再为同一个包反复发起注定失败的请求
+_description_negative_cache = {}
+_DESCRIPTION_NEG_TTL = 3600
+
+# 描述更新事件 - 后台更新完成时置位，供API层长轮询等待
+description_update_event = threading.Event()
+
+# 最近一次描述更新完成的时间戳 - 长轮询以此判断客户端是否错过更新，
+# 事件只作唤醒用，不承担"是否有更新"的状态（多客户端下事件会被抢先消费）
+last_description_update = 0.0
+
+# 已安装依赖集合的版本号 - 每次安装/卸载/更新/切换环境后递增，
+# API层据此判断缓存的序列化结果是否仍然有效（ETag）
+_cache_version = 0
+
+# 已安装distribution快照缓存 - distributions()每次都重扫sys.path，开销不小
+_dist_cache = {'ts': 0.0, 'data': None}
+_dist_lock = threading.Lock()
+_DIST_CACHE_TTL = 30
+
+def _cached_distributions():
+    """
+    返回当前进程环境中已安装包的轻量快照
+
+    结果缓存30秒，安装/卸载等变更操作通过bump_cache_version主动失效
+
+    Returns:
+        list: (包名小写, 版本) 元组列表
+    """
+    now = time.monotonic()
+    with _dist_lock:
+        if _dist_cache['data'] is not None and now - _dist_cache['ts'] < _DIST_CACHE_TTL:
+            return _dist_cache['data']
+
+    records = []
+    for dist in distributions():
+        try:
+            # metadata查找不区分大小写且缺失时返回None，只需取一次再小写
+            name = dist.metadata['Name']
+            if name:
+                records.append((name.lower(), dist.version))
+        except Exception:
+            continue
+
+    with _dist_lock:
+        _dist_cache['ts'] = now
+        _dist_cache['data'] = records
+    return records
+
+def _is_current_interpreter(python_executable):
+    """判断给定解释器路径是否就是当前进程的解释器"""
+    try:
+        return os.path.samefile(python_executable, sys.executable)
+    except OSError:
+        return os.path.normcase(python_executable) == os.path.normcase(sys.executable)
+
+# 常驻辅助解释器 - 为非当前环境保留一个子进程，反复刷新时
+# 免去每次100-300ms的解释器启动；环境切换或进程退出时自动重建
+_helper_lock = threading.Lock()
+_helper_proc = None
+_helper_exe = None
+
+def _helper_request(python_executable, command):
+    """
+    向常驻辅助解释器发送一条命令并读取单行JSON响应
+
+    Args:
+        python_executable (str): 目标环境的解释器路径
+        command (str): 命令行（LIST_DEPS / LIST_NAMES / QUERY <包名>）
+
+    Returns:
+        解析后的JSON结果；通信失败时返回None，调用方应回退到一次性子进程
+    """
+    global _helper_proc, _helper_exe
+    with _helper_lock:
+        try:
+            if (_helper_proc is None or _helper_proc.poll() is not None
+                    or _helper_exe != python_executable):
+                if _helper_proc is not None:
+                    try:
+                        _helper_proc.kill()
+                    except Exception:
+                        pass
+                _helper_proc = subprocess.Popen(
+                    [python_executable, '-u', '-c', _HELPER_LOOP_SCRIPT],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    text=True,
+                    encoding='utf-8'
+                )
+                _helper_exe = python_executable
+
+            _helper_proc.stdin.write(command + '\n')
+            _helper_proc.stdin.flush()
+            line = _helper_proc.stdout.readline()
+            if not line:
+                raise RuntimeError('辅助进程已退出')
+            return _json_loads(line)
+        except Exception as e:
+            core.print_status(f"辅助解释器通信失败: {e}", 'warning')
+            if _helper_proc is not None:
+                try:
+                    _helper_proc.kill()
+                except Exception:
+                    pass
+                _helper_proc = None
+            return None
+
+@functools.lru_cache(maxsize=1)
+def _installed_name_set():
+    """
+    返回已安装包名的集合，供O(1)存在性检查
+
+    批量卸载K个包时总成本从O(K·N)降到O(N+K)；
+    变更操作通过bump_cache_version清空
+
+    Returns:
+        frozenset: 已安装包名（小写）集合
+    """
+    return frozenset(name for name, _ in _cached_distributions())
+
+def _invalidate_dist_cache():
+    """使已安装distribution快照失效（安装/卸载/更新后调用）"""
+    with _dist_lock:
+        _dist_cache['data'] = None
+    _installed_name_set.cache_clear()
+
+def bump_cache_version():
+    """递增依赖缓存版本号，使API层缓存的响应失效"""
+    global _cache_version
+    _cache_version += 1
+    # 依赖集合已变化，同时丢弃distribution快照和图遍历用的逐包缓存
+    _invalidate_dist_cache()
+    get_package_info.cache_clear()
+    get_package_dependencies.cache_clear()
+    is_package_installed.cache_clear()
+
+def _mark_descriptions_updated():
+    """记录描述更新时间戳，并唤醒等待更新的长轮询请求"""
+    sys.modules[__name__].last_description_update = time.time()
+    # 先让API层缓存的响应和ETag失效，被唤醒的前端重新拉取时才能拿到新描述
+    bump_cache_version()
+    description_update_event.set()
+
+# 加载缓存的依赖描述
+def load_descriptions():
+    """
+    加载依赖描述缓存
+    
+    Returns:
+        dict: 依赖描述字典    """
+    global dependency_descriptions
+    dependency_descriptions = core.load_description_cache()
+    return dependency_descriptions
+
+# 保存依赖描述缓存
+def save_descriptions():
+    """
+    保存依赖描述到缓存文件
+    
+    Returns:
+        bool: 是否成功保存
+    """
+    return core.save_description_cache(dependency_descriptions)
+
+# 获取单个依赖信息
+def get_single_dependency(package_name):
+    """
+    获取单个依赖的详细信息
+    
+    Args:
+        package_name (str): 依赖包名称
+        
+    Returns:
+        dict: 依赖信息字典，如果找不到则返回None
+    """
+    try:
+        # 获取当前环境中安装的所有依赖
+        all_dependencies = get_all_dependencies(use_cache=False)
+        
+        # 查找指定依赖
+        for dep in all_dependencies:
+            if dep.get('name', '').lower() == package_name.lower():
+                return dep
+                
+        return None
+    except Exception as e:
+        core.print_status(f"获取单个依赖信息时出错: {str(e)}", 'error')
+        return None
+
+# 后台更新去抖 - 短时间内的重复触发（多标签页/刷新风暴）合并为一次执行
+_debounce_lock = threading.Lock()
+_debounce_state = {'in_flight': False, 'last_started_at': 0.0}
+_DEBOUNCE_WINDOW = 5  # 秒
+
+def _debounce_acquire():
+    """尝试获取后台更新的执行权，去抖窗口内或已有任务在跑时返回False"""
+    with _debounce_lock:
+        if _debounce_state['in_flight']:
+            return False
+        if time.time() - _debounce_state['last_started_at'] < _DEBOUNCE_WINDOW:
+            return False
+        _debounce_state['in_flight'] = True
+        _debounce_state['last_started_at'] = time.time()
+        return True
+
+def _debounce_release():
+    """释放后台更新执行权"""
+    with _debounce_lock:
+        _debounce_state['in_flight'] = False
+
+# 异步更新依赖描述
+def async_update_descriptions(only_missing=True):
+    """
+    异步更新依赖描述（排队到共享后台工作线程执行）
+
+    该函数会访问PyPI API获取每个依赖的详细描述
+
+    Args:
+        only_missing (bool): 如果为True，只更新缺少描述的依赖，否则更新所有依赖
+    """
+    _enqueue_refresh('descriptions', only_missing)
+
+def _update_descriptions_now(only_missing=True):
+    """
+    在后台工作线程中实际执行依赖描述更新
+
+    Args:
+        only_missing (bool): 如果为True，只更新缺少描述的依赖，否则更新所有依赖
+    """
+    # 合并短时间内的重复触发，避免多个后台线程同时刷PyPI
+    if not _debounce_acquire():
+        return
+    try:
+        updated = False
+        missing_deps = []
+        
+        # 获取当前激活的Python环境路径
+        python_executable = core.get_active_python_executable()
+        
+        # 如果非only_missing模式 (环境已变更)，记录日志
+        if not only_missing:
+            core.print_status(f"环境切换后，将更新所有依赖的描述", 'info')
+        
+        # 获取当前环境的依赖包名列表
+        core.print_status(f"正在使用 {python_executable} 获取当前环境的依赖列表", 'info')
+
+        if _is_current_interpreter(python_executable):
+            # 活动环境就是当前进程的解释器，进程内直接读取，免去子解释器启动
+            package_list = [name for name, _ in _cached_distributions()]
+        else:
+            # 优先走常驻辅助解释器，失败时回退到一次性子进程
+            package_list = _helper_request(python_executable, 'LIST_NAMES')
+            if package_list is None:
+                result = subprocess.run(
+                    [python_executable, '-c', _LIST_DEP_NAMES_SCRIPT],
+                    capture_output=True,
+                    text=True,
+                    encoding='utf-8'
+                )
+
+                if result.returncode != 0:
+                    core.print_status(f"获取依赖失败: {result.stderr}", 'error')
+                    return
+
+                # 解析脚本输出获取所有依赖包名
+                package_list = _json_loads(result.stdout)
+        core.print_status(f"当前环境共有 {len(package_list)} 个依赖包", 'info')
+
+        # 不论是否环境变更，始终只更新缺失的描述
+        # 统计缺失的依赖
+        current_keys = set(package_list)
+        old_keys = set(dependency_descriptions.keys())
+        missing_keys = current_keys - old_keys
+
+        # 近期已确认在PyPI上查不到的包跳过，TTL过后才重试
+        now = time.time()
+        missing_keys = {
+            pkg for pkg in missing_keys
+            if now - _description_negative_cache.get(pkg, 0) >= _DESCRIPTION_NEG_TTL
+        }
+
+        if missing_keys:
+            core.print_status(f"发现 {len(missing_keys)} 个需要获取描述的新包", 'info')
+            # 只把真正缺失描述的包添加到更新列表
+            missing_deps = list(missing_keys)
+        else:
+            core.print_status("当前环境中的所有依赖描述都已是最新状态", 'info')
+
+            # 即使没有缺失的描述，当环境变更时也更新时间戳以触发前端刷新
+            if not only_missing:
+                _mark_descriptions_updated()
+
+            return
+
+
+        # 如果有需要更新描述的依赖，打印日志
+        if missing_deps:
+            core.print_status(f"发现 {len(missing_deps)} 个需要更新描述的依赖，将在后台更新", 'info')
+            
+        # 并行获取需要更新的依赖的描述（纯网络I/O，并发度限制在20避免刷爆PyPI）
+        def _fetch_summary(pkg_name):
+            try:
+                # 从PyPI获取依赖描述（同一响应也刷新了版本缓存）
+                data = _fetch_pypi_json(pkg_name)
+                if data is not None:
+                    return pkg_name, data.get('info', {}).get('summary', "")
+                # 查不到的包记入负缓存，避免每次扫描都重复请求
+                _description_negative_cache[pkg_name] = time.time()
+            except Exception as e:
+                core.print_status(f"更新 {pkg_name} 的描述时出错: {e}", 'warning')
+            return pkg_name, None
+
+        with ThreadPoolExecutor(max_workers=min(20, len(missing_deps))) as pool:
+            for pkg_name, summary in pool.map(_fetch_summary, missing_deps):
+                if summary is not None:
+                    dependency_descriptions[pkg_name] = summary
+                    updated = True
+        
+        if updated:
+            core.print_status(f"已更新 {len(missing_deps)} 个依赖的描述", 'info')
+            save_descriptions()
+            # 标记更新时间戳并唤醒长轮询，这个会被暴露给API模块使用
+            _mark_descriptions_updated()
+        elif not missing_deps:
+            core.print_status("当前环境中的所有依赖描述都已是最新状态", 'info')
+    except Exception as e:
+        core.print_status(f"异步更新依赖描述时出错: {e}", 'error')
+    finally:
+        _debounce_release()
+
+# 后台刷新所有依赖的最新版本和缺失描述
+def async_update_descriptions_and_versions(task_id=None):
+    """
+    后台刷新所有非系统依赖的最新版本信息，并补齐缺失的描述
+
+    Args:
+        task_id (str, optional): 任务ID，提供时会实时上报进度
+    """
+    # 合并短时间内的重复触发，避免并发刷PyPI
+    if not _debounce_acquire():
+        if task_id is not None:
+            core.complete_task(task_id)
+        return
+    try:
+        # 获取已安装的依赖列表
+        all_deps = get_all_dependencies(use_cache=True)
+
+        # 筛选需要检查的包 - 排除系统依赖和软件依赖
+        packages = [
+            dep['name'] for dep in all_deps
+            if not dep['isSystem'] and not dep['isAppRequired']
+        ]
+        total = len(packages)
+        core.print_status(f"开始检查 {total} 个依赖的版本信息", 'info')
+
+        if task_id is not None:
+            task = core.task_progress.get(task_id)
+            if task is not None:
+                with task.lock:
+                    task.total = total
+
+        updated = False
+        for index, pkg_name in enumerate(packages):
+            try:
+                if not dependency_descriptions.get(pkg_name):
+                    # 描述缺失时走JSON端点，一次请求同时拿到版本和描述
+                    data = _fetch_pypi_json(pkg_name)
+                    if data is not None:
+                        dependency_descriptions[pkg_name] = data.get('info', {}).get('summary', "")
+                        updated = True
+                else:
+                    # 只需版本时走更轻量的simple索引
+                    get_latest_version_from_pypi(pkg_name, force_refresh=True)
+            except Exception as e:
+                core.print_status(f"检查 {pkg_name} 版本信息时出错: {e}", 'warning')
+
+            if task_id is not None:
+                core.update_task_progress(task_id, index + 1, f'检查 {pkg_name} ({index + 1}/{total})')
+
+        if updated:
+            save_descriptions()
+
+        # 强制刷新拿到的新版本信息落盘
+        _save_pypi_cache()
+
+        # 即使描述无变化，latestVersion/isLatest也可能已更新：
+        # 无条件失效API层缓存并唤醒长轮询，前端才能拿到检查结果
+        sys.modules[__name__].last_version_update = time.time()
+        _mark_descriptions_updated()
+
+        if task_id is not None:
+            core.complete_task(task_id)
+
+        core.print_status("依赖版本检查完成", 'success')
+    except Exception as e:
+        core.print_status(f"后台检查依赖版本时出错: {e}", 'error')
+        if task_id is not None:
+            core.complete_task(task_id, [str(e)])
+    finally:
+        _debounce_release()
+
+# 获取所有已安装的依赖信息
+# 完整依赖列表的TTL缓存 - key含缓存版本号，安装/卸载/更新时bump_cache_version自动使其失效
+_deps_result_cache = {'key': None, 'ts': 0.0, 'value': None}
+_deps_result_lock = threading.Lock()
+_DEPS_RESULT_TTL = 60
+
+# 后台版本刷新完成时间戳，与last_description_update同机制，供前端轮询
+last_version_update = 0.0
+
+# 共享后台刷新队列 - 描述和最新版本刷新都经由同一个守护线程，
+# 排队期间的重复触发被合并去重，PyPI访问天然限流
+_refresh_queue = queue.Queue()
+_refresh_worker_lock = threading.Lock()
+_refresh_worker_started = False
+
+def _enqueue_refresh(kind, payload):
+    """把一项后台刷新任务放入共享队列，并确保工作线程已启动"""
+    global _refresh_worker_started
+    if not _refresh_worker_started:
+        with _refresh_worker_lock:
+            if not _refresh_worker_started:
+                threading.Thread(target=_refresh_loop, daemon=True).start()
+                _refresh_worker_started = True
+    _refresh_queue.put((kind, payload))
+
+def _refresh_loop():
+    """后台刷新工作线程主循环：取出并合并排队任务后逐类执行"""
+    while True:
+        jobs = [_refresh_queue.get()]
+        # 把排队期间积累的任务一次取空，同类任务合并执行
+        try:
+            while True:
+                jobs.append(_refresh_queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        desc_flags = [payload for kind, payload in jobs if kind == 'descriptions']
+        version_pkgs = set()
+        for kind, payload in jobs:
+            if kind == 'latest_versions':
+                version_pkgs.update(payload)
+
+        if desc_flags:
+            try:
+                # 只要有一次触发要求全量更新，合并后的执行就走全量
+                _update_descriptions_now(only_missing=all(desc_flags))
+            except Exception as e:
+                core.print_status(f"后台更新依赖描述失败: {e}", 'warning')
+        if version_pkgs:
+            try:
+                _refresh_latest_versions_now(sorted(version_pkgs))
+            except Exception as e:
+                core.print_status(f"后台刷新最新版本失败: {e}", 'warning')
+
+def _schedule_version_refresh(package_names):
+    """
+    把给定包的PyPI最新版本刷新排入共享后台队列
+
+    刷新完成后递增缓存版本号并唤醒长轮询，前端下次拉取列表时
+    拿到新的"最新"标记；排队中的重复请求会被合并
+
+    Args:
+        package_names (list): 需要刷新最新版本的包名列表
+    """
+    _enqueue_refresh('latest_versions', tuple(package_names))
+
+def _refresh_latest_versions_now(package_names):
+    """在后台工作线程中实际刷新给定包的最新版本"""
+    with ThreadPoolExecutor(max_workers=min(32, len(package_names))) as pool:
+        list(pool.map(get_latest_version_from_pypi, package_names))
+    # 批量查询结束后落盘一次，下次启动直接命中
+    _save_pypi_cache()
+    sys.modules[__name__].last_version_update = time.time()
+    # 版本号变了，丢弃API层缓存的响应并唤醒长轮询，前端随即重新拉取
+    bump_cache_version()
+    description_update_event.set()
+
+def get_all_dependencies(use_cache=True):
+    """
+    获取所有已安装的Python依赖信息
+
+    Args:
+        use_cache (bool): 是否清除PyPI最新版本缓存。如果为False，将清除缓存，强制重新获取最新版本
+
+    Returns:
+        list: 依赖信息列表
+    """
+    dependencies = []
+
+    # 获取当前激活的Python环境路径
+    python_executable = core.get_active_python_executable()
+
+    # TTL内且依赖集合未变化时直接复用上次结果，UI轮询不再反复扫描环境和查询PyPI
+    result_key = (python_executable, _cache_version)
+    if use_cache:
+        with _deps_result_lock:
+            if (_deps_result_cache['value'] is not None
+                    and _deps_result_cache['key'] == result_key
+                    and time.time() - _deps_result_cache['ts'] < _DEPS_RESULT_TTL):
+                return _deps_result_cache['value']
+    else:
+        # 如果不使用缓存，清理过期的PyPI版本缓存条目，而不是完全清空
+        refresh_version_cache()
+
+    # 不再使用缓存文件，直接使用字典保存处理过程中的信息
+    dependency_dict = {}
+
+    # 获取指定Python环境的依赖列表
+    try:
+        if _is_current_interpreter(python_executable):
+            # 活动环境就是当前进程的解释器，进程内直接读取已安装包快照，
+            # 免去100-300ms的子解释器启动和JSON编解码
+            name_version_pairs = _cached_distributions()
+        else:
+            # 优先走常驻辅助解释器，失败时回退到一次性子进程
+            deps_data = _helper_request(python_executable, 'LIST_DEPS')
+            if deps_data is None:
+                result = subprocess.run(
+                    [python_executable, '-c', _LIST_DEPS_SCRIPT],
+                    capture_output=True,
+                    text=True,
+                    encoding='utf-8'
+                )
+
+                if result.returncode != 0:
+                    core.print_status(f"获取依赖失败: {result.stderr}", 'error')
+                    return []
+
+                # 解析脚本输出
+                deps_data = _json_loads(result.stdout)
+            name_version_pairs = [(d['name'], d['version']) for d in deps_data]
+
+        # 先按包名分组，再对每组取最高版本；每个版本字符串只解析一次，
+        # 且版本全部相同的重复项（最常见情形）完全不触发解析
+        groups = {}
+        for pkg_name, pkg_version in name_version_pairs:
+            groups.setdefault(pkg_name, []).append(pkg_version)
+
+        for pkg_name, versions in groups.items():
+            unique_versions = set(versions)
+            if len(unique_versions) > 1:
+                try:
+                    # 保留最高的版本
+                    pkg_version = max(unique_versions, key=_parse_version)
+                except Exception as e:
+                    core.print_status(f"版本比较出错 {pkg_name}: {e}", 'warning')
+                    pkg_version = versions[0]
+            else:
+                pkg_version = versions[0]
+
+            is_system = pkg_name in SYSTEM_DEPENDENCIES
+            is_core = pkg_name in CORE_DEPENDENCIES
+            is_ai_model = pkg_name in AI_MODEL_DEPENDENCIES
+            is_app_required = pkg_name in APP_DEPENDENCIES
+            description = dependency_descriptions.get(pkg_name, "")
+
+            # 第一遍只填充本地信息，最新版本在第二遍并行查询
+            # 存储依赖信息到字典中，以防止重复
+            dependency_dict[pkg_name] = {
+                'name': pkg_name,
+                'version': pkg_version,
+                'description': description,
+                'isSystem': is_system,
+                'isCore': is_core,
+                'isAIModel': is_ai_model,
+                'isAppRequired': is_app_required,
+                'isLatest': False,
+                'latestVersion': ""
+            }
+    except Exception as e:
+        core.print_status(f"获取依赖列表失败: {e}", 'error')
+        return []
+
+    # 第二遍：最新版本只从本地缓存填充，缺失/过期的交给后台线程刷新，
+    # 列表响应不再被N次PyPI往返阻塞，"最新"标记随后台刷新异步补齐
+    with _pypi_cache_lock:
+        cache_snapshot = dict(_pypi_version_cache)
+
+    now = time.time()
+    expire_time = now - (24 * 60 * 60)
+    stale = []
+    for pkg_name, dep in dependency_dict.items():
+        if dep['isSystem'] or dep['isAppRequired']:
+            continue
+
+        cached = cache_snapshot.get(pkg_name)
+        if cached is None or cached.get('timestamp', 0) < expire_time:
+            stale.append(pkg_name)
+        if not cached:
+            continue
+
+        try:
+            latest_version = cached.get('version', '')
+            if not latest_version:
+                continue
+            dep['latestVersion'] = latest_version
+
+            # 绝大多数包的版本字符串完全一致，原始字符串相等时连标准化都省掉
+            is_latest = (dep['version'] == latest_version)
+
+            # 其次使用标准化的版本比较函数
+            if not is_latest:
+                norm_current = normalize_version(dep['version'])
+                norm_latest = normalize_version(latest_version)
+                is_latest = (norm_current == norm_latest)
+
+            # 如果标准化版本不相等，使用精确的版本比较
+            if not is_latest:
+                try:
+                    is_latest = _parse_version(dep['version']) >= _parse_version(latest_version)
+                except Exception:
+                    # 如果精确比较失败，使用简化比较
+                    is_latest = (dep['version'] == latest_version)
+            dep['isLatest'] = is_latest
+        except Exception as e:
+            core.print_status(f"获取{pkg_name}的最新版本信息失败: {e}", 'warning')
+
+    if stale:
+        _schedule_version_refresh(stale)
+
+    # 将字典值转换为列表
+    dependencies = list(dependency_dict.values())
+
+    with _deps_result_lock:
+        _deps_result_cache['key'] = result_key
+        _deps_result_cache['ts'] = time.time()
+        _deps_result_cache['value'] = dependencies
+
+    return dependencies
+
+# 逐包JSON片段缓存 - name -> (指纹, 序列化字节)
+_frag_cache = {}
+
+def serialize_dependencies(dependencies):
+    """
+    将依赖列表序列化为JSON字节，按包缓存序列化片段
+
+    每个包的JSON片段只在其版本/描述等字段变化时重新编码，
+    典型调用只做字节拼接而不重新序列化整个列表
+
+    Args:
+        dependencies (list): 依赖信息字典列表
+
+    Returns:
+        bytes: JSON数组的UTF-8字节
+    """
+    fragments = []
+    live_names = set()
+
+    for dep in dependencies:
+        name = dep.get('name', '')
+        live_names.add(name)
+        # 指纹覆盖所有可能变化的字段，命中时直接复用缓存的字节
+        key = (dep.get('version'), dep.get('latestVersion'),
+               dep.get('isLatest'), dep.get('description'))
+        cached = _frag_cache.get(name)
+        if cached is not None and cached[0] == key:
+            fragments.append(cached[1])
+            continue
+        if orjson is not None:
+            frag = orjson.dumps(dep)
+        else:
+            frag = json.dumps(dep).encode('utf-8')
+        _frag_cache[name] = (key, frag)
+        fragments.append(frag)
+
+    # 清理已卸载包的片段，避免缓存无限增长
+    # pop而非del：并发请求可能同时算出相同的过期集合，重复删除不应抛KeyError
+    for stale in set(_frag_cache) - live_names:
+        _frag_cache.pop(stale, None)
+
+    return b'[' + b','.join(fragments) + b']'
+
+# PyPI版本信息缓存文件 - 跨进程重启持久化，24小时TTL由条目时间戳控制
+# 路径定义在core中，/api/cache-info读取的是同一个文件
+_PYPI_CACHE_FILE = core.PYPI_VERSION_CACHE_FILE
+
+def _load_pypi_cache():
+    """从磁盘加载上次保存的PyPI版本缓存，失败时返回空字典"""
+    try:
+        with open(_PYPI_CACHE_FILE, 'rb') as f:
+            content = f.read()
+        data = orjson.loads(content) if orjson is not None else json.loads(content)
+        if isinstance(data, dict):
+            return data
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        core.print_status(f"加载PyPI版本缓存失败: {e}", 'warning')
+    return {}
+
+def _save_pypi_cache():
+    """将PyPI版本缓存原子写入磁盘，供下次启动复用"""
+    tmp_path = f"{_PYPI_CACHE_FILE}.tmp-{os.getpid()}"
+    try:
+        with _pypi_cache_lock:
+            snapshot = dict(_pypi_version_cache)
+        if orjson is not None:
+            payload = orjson.dumps(snapshot)
+        else:
+            payload = json.dumps(snapshot, ensure_ascii=False).encode('utf-8')
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, _PYPI_CACHE_FILE)
+    except Exception as e:
+        core.print_status(f"保存PyPI版本缓存失败: {e}", 'warning')
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+# PyPI版本信息缓存，避免重复请求，添加时间戳
+# 启动时从磁盘恢复，过期条目由refresh_version_cache按时间戳清理
+# 并行版本查询会多线程读写该缓存，用锁保护
+_pypi_cache_lock = threading.Lock()
+_pypi_version_cache = _load_pypi_cache()
+
+# 基于时间的缓存刷新
+def refresh_version_cache(force_refresh=False):
+    """
+    基于时间刷新PyPI版本缓存
+    
+    清理过期的PyPI版本缓存条目，而不是完全清空缓存
+    
+    Args:
+        force_refresh (bool): 如果为True，则强制刷新所有缓存
+    """
+    global _pypi_version_cache
+    import time
+    
+    # 计算过期时间 (24小时)
+    current_time = time.time()
+    expire_time = current_time - (24 * 60 * 60)
+    
+    if force_refresh:
+        # 强制刷新模式下，清空所有缓存
+        with _pypi_cache_lock:
+            _pypi_version_cache = {}
+        return
+
+    with _pypi_cache_lock:
+        # 查找并移除过期的缓存条目
+        expired_keys = [
+            pkg_name for pkg_name, pkg_data in _pypi_version_cache.items()
+            if 'timestamp' not in pkg_data or pkg_data['timestamp'] < expire_time
+        ]
+
+        # 从缓存中移除过期条目
+        for key in expired_keys:
+            _pypi_version_cache.pop(key, None)
+      # 如果有条目被移除，输出日志并同步落盘，避免重启后过期条目复活
+    if expired_keys:
+        core.print_status(f"已清理 {len(expired_keys)} 个过期的PyPI版本缓存条目", 'info')
+        _save_pypi_cache()
+
+def _fetch_pypi_json(pkg_name):
+    """
+    获取包的PyPI JSON元数据，并顺带更新版本缓存
+
+    描述和最新版本来自同一响应，需要两者时只发一次请求
+
+    Args:
+        pkg_name (str): 包名
+
+    Returns:
+        dict: 解析后的JSON数据，失败时返回None
+    """
+    try:
+        response = _get_session().get(f"https://pypi.org/pypi/{pkg_name}/json", timeout=5)
+        if response.status_code != 200:
+            return None
+        data = response.json()
+        latest = data.get('info', {}).get('version', '')
+        if latest:
+            with _pypi_cache_lock:
+                _pypi_version_cache[pkg_name] = {'version': latest, 'timestamp': time.time()}
+        return data
+    except Exception as e:
+        core.print_status(f"获取{pkg_name}的PyPI信息失败: {e}", 'warning')
+        return None
+
+# PEP 691 simple索引的JSON格式请求头
+_SIMPLE_HEADERS = {'Accept': 'application/vnd.pypi.simple.v1+json'}
+
+def _latest_from_simple(data):
+    """
+    从PEP 691 simple索引响应中提取最新版本号
+
+    Args:
+        data (dict): simple索引的JSON响应
+
+    Returns:
+        str: 最新版本号，解析失败时返回空字符串
+    """
+    # PEP 700 (v1.1) 直接带versions列表；旧实现退化为从文件名解析
+    versions = data.get('versions')
+    if not versions:
+        versions = set()
+        for file_info in data.get('files', []):
+            filename = file_info.get('filename', '')
+            try:
+                if filename.endswith('.whl'):
+                    versions.add(str(parse_wheel_filename(filename)[1]))
+                else:
+                    versions.add(str(parse_sdist_filename(filename)[1]))
+            except Exception:
+                continue
+
+    parsed = []
+    for v in versions:
+        try:
+            parsed.append(version.parse(str(v)))
+        except Exception:
+            continue
+    if not parsed:
+        return ''
+
+    # 优先取最新的正式版本，全是预发布时才取预发布
+    stable = [p for p in parsed if not p.is_prerelease]
+    return str(max(stable or parsed))
+
+def get_latest_version_from_pypi(package_name, force_refresh=False):
+    """
+    从PyPI获取包的最新版本信息，使用带时间戳的缓存
+    
+    Args:
+        package_name (str): 包名
+        force_refresh (bool): 是否强制刷新，忽略缓存
+    
+    Returns:
+        dict: 包含版本信息的字典
+    """
+    import time
+    current_time = time.time()
+
+    with _pypi_cache_lock:
+        cache_entry = _pypi_version_cache.get(package_name)
+
+    # 检查缓存是否有效（24小时内）
+    if not force_refresh:
+        # 检查时间戳是否存在且未过期
+        if cache_entry is not None and 'timestamp' in cache_entry \
+                and current_time - cache_entry['timestamp'] < 24 * 60 * 60:
+            return cache_entry
+
+    try:
+        # PEP 691 simple索引只含文件/版本列表，响应比逐包JSON端点小几个数量级，
+        # 且被CDN更积极地缓存
+        url = f"https://pypi.org/simple/{package_name}/"
+        headers = _SIMPLE_HEADERS
+        if cache_entry and cache_entry.get('etag') and cache_entry.get('version'):
+            # 条件GET：包未发新版时Fastly返回无包体的304，省掉下载和解析
+            headers = dict(_SIMPLE_HEADERS, **{'If-None-Match': cache_entry['etag']})
+        response = _get_session().get(url, timeout=5, headers=headers)
+
+        if response.status_code == 304:
+            # 内容未变，仅续期时间戳
+            version_info = dict(cache_entry, timestamp=current_time)
+            with _pypi_cache_lock:
+                _pypi_version_cache[package_name] = version_info
+            return version_info
+
+        latest = ''
+        etag = ''
+        if response.status_code == 200:
+            latest = _latest_from_simple(_json_loads(response.content))
+            etag = response.headers.get('ETag', '')
+
+        if not latest:
+            # simple索引未命中时回退到旧的逐包JSON端点
+            response = _get_session().get(f"https://pypi.org/pypi/{package_name}/json", timeout=5)
+            if response.status_code == 200:
+                latest = _json_loads(response.content).get('info', {}).get('version', '')
+                etag = ''
+
+        if latest:
+            version_info = {
+                'version': latest,
+                'timestamp': current_time  # 添加时间戳
+            }
+            if etag:
+                version_info['etag'] = etag
+            with _pypi_cache_lock:
+                _pypi_version_cache[package_name] = version_info
+            return version_info
+        return {'version': '', 'timestamp': current_time}
+    except Exception as e:
+        core.print_status(f"获取{package_name}的PyPI信息失败: {e}", 'warning')
+        return {'version': '', 'timestamp': current_time}
+
+@functools.lru_cache(maxsize=4096)
+def _parse_version(version_str):
+    """解析版本字符串为Version对象，结果按字符串缓存（版本解析是热点）"""
+    return version.parse(version_str)
+
+# 版本标准化函数
+@functools.lru_cache(maxsize=4096)
+def normalize_version(version_str):
+    """
+    标准化版本字符串为数字元组，便于比较
+
+    Version.release按构造就剔除了pre/post/dev等后缀段，
+    无需再做字符串裁剪；解析结果复用_parse_version的缓存
+
+    Args:
+        version_str (str): 版本字符串
+
+    Returns:
+        tuple: 版本的数字段元组，无法解析时回退为原字符串
+    """
+    if not version_str:
+        return ()
+
+    try:
+        return _parse_version(str(version_str)).release
+    except Exception:
+        # 非PEP 440版本号退回按原始字符串比较
+        return version_str
+
+# 卸载依赖
+def uninstall_dependency(dependency):
+    """
+    卸载单个依赖
+    
+    Args:
+        dependency (str): 依赖名称
+        
+    Returns:
+        tuple: (success, message) 元组
+    """
+    try:
+        # 检查是否是系统依赖或应用依赖
+        if dependency.lower() in SYSTEM_DEPENDENCIES:
+            return False, f'{dependency} 是系统依赖，不能卸载'
+        
+        if dependency.lower() in APP_DEPENDENCIES:
+            return False, f'{dependency} 是软件运行依赖，不能卸载'
+        
+        # 检查依赖是否存在，避免卸载不存在的依赖时返回成功
+        if dependency.lower() not in _installed_name_set():
+            return False, f'{dependency} 未安装或已被卸载'
+        
+        core.print_status(f"正在卸载 {dependency}...", 'start')
+        
+        # 使用当前活动环境的Python
+        python_executable = core.get_active_python_executable()
+        
+        # 执行卸载命令
+        process = subprocess.run(
+            [python_executable, '-m', 'pip', 'uninstall', '-y', dependency],
+            capture_output=True, 
+            text=True
+        )
+        
+        # 检查返回状态
+        if process.returncode != 0:
+            error_message = process.stderr or "卸载失败，但没有详细错误信息"
+            core.print_status(f"卸载 {dependency} 失败: {error_message}", 'error')
+            return False, f'卸载失败: {error_message}'
+        
+        core.print_status(f"成功卸载 {dependency}", 'success')
+        bump_cache_version()
+        return True, f'成功卸载: {dependency}'
+    except Exception as e:
+        core.print_status(f"卸载 {dependency} 过程中出错: {str(e)}", 'error')
+        return False, f'卸载过程中出错: {str(e)}'
+
+# 更新依赖
+def update_dependency(dependency, task_id):
+    """
+    更新依赖到最新版本
+    
+    Args:
+        dependency (str): 依赖名称
+        task_id (str): 任务ID
+        
+    Returns:
+        bool: 是否成功
+    """
+    try:
+        core.update_task_progress(task_id, 10, f'开始更新 {dependency}...')
+        
+        # 更新依赖
+        core.print_status(f"正在更新 {dependency} 到最新版本...", 'start')
+        
+        # 使用当前活动环境的Python
+        python_executable = core.get_active_python_executable()
+        
+        # 使用流式处理函数处理命令输出
+        cmd = [python_executable, '-m', 'pip', 'install', '--upgrade', dependency]
+        success = core.stream_process_output(cmd, task_id, dependency)
+        
+        if not success:
+            core.print_status(f"更新 {dependency} 失败", 'error')
+            core.update_task_progress(task_id, 100, f'更新 {dependency} 失败')
+            return False
+        
+        core.print_status(f"成功更新 {dependency} 到最新版本", 'success')
+        core.update_task_progress(task_id, 100, f'成功更新 {dependency}')
+        bump_cache_version()
+        return True
+    except Exception as e:
+        core.print_status(f"更新 {dependency} 时发生错误: {str(e)}", 'error')
+        return False
+
+# 切换版本
+def switch_version(package, version, task_id):
+    """
+    切换依赖版本
+    
+    Args:
+        package (str): 包名称
+        version (str): 目标版本
+        task_id (str): 任务ID
+        
+    Returns:
+        bool: 是否成功
+    """
+    try:
+        core.update_task_progress(task_id, 10, f'开始将 {package} 切换到版本 {version}...')
+        
+        # 切换版本
+        core.print_status(f"正在将 {package} 切换到版本 {version}...", 'start')
+        
+        # 使用当前活动环境的Python
+        python_executable = core.get_active_python_executable()
+        
+        # 使用流式处理函数处理命令输出
+        cmd = [python_executable, '-m', 'pip', 'install', f'{package}=={version}', '--force-reinstall']
+        success = core.stream_process_output(cmd, task_id, package)
+        
+        if not success:
+            core.print_status(f"切换 {package} 到版本 {version} 失败", 'error')
+            core.update_task_progress(task_id, 100, f'切换 {package} 到版本 {version} 失败')
+            return False
+        
+        core.print_status(f"成功将 {package} 切换到版本 {version}", 'success')
+        core.update_task_progress(task_id, 100, f'成功将 {package} 切换到版本 {version}')
+        bump_cache_version()
+        return True
+    except Exception as e:
+        core.print_status(f"切换版本时发生错误: {str(e)}", 'error')
+        return False
+
+# 批量卸载
+def batch_uninstall(packages, task_id):
+    """
+    批量卸载多个依赖
+    
+    Args:
+        packages (list): 依赖名称列表
+        task_id (str): 任务ID
+    
+    Returns:
+        bool: 是否全部成功
+    """
+    errors = []
+
+    # 先过滤受保护的依赖
+    to_remove = []
+    for pkg in packages:
+        if pkg.lower() in SYSTEM_DEPENDENCIES or pkg.lower() in APP_DEPENDENCIES:
+            errors.append(f"{pkg}: 系统或软件依赖不能卸载")
+        else:
+            to_remove.append(pkg)
+
+    if to_remove:
+        try:
+            # 单次pip调用卸载整批包，摊销进程启动开销
+            python_executable = core.get_active_python_executable()
+            cmd = [python_executable, '-m', 'pip', 'uninstall', '-y', *to_remove]
+            success = core.stream_process_output(cmd, task_id, f'{len(to_remove)} 个包')
+
+            if success:
+                bump_cache_version()
+            else:
+                # 批量模式失败时回退到逐包卸载，尽量完成其余包
+                core.print_status("批量卸载失败，回退到逐包卸载", 'warning')
+                total = len(to_remove)
+                for index, pkg in enumerate(to_remove, 1):
+                    try:
+                        core.update_task_progress(task_id, index, f'卸载 {pkg} ({index}/{total})')
+                        ok, message = uninstall_dependency(pkg)
+                        if not ok:
+                            errors.append(f"{pkg}: {message}")
+                    except Exception as e:
+                        errors.append(f"{pkg}: {str(e)}")
+        except Exception as e:
+            errors.append(f"批量卸载出错: {str(e)}")
+
+    # 完成任务
+    core.complete_task(task_id, errors)
+
+    # 如果有错误，则返回失败
+    return len(errors) == 0
+
+# 批量更新
+def batch_update(packages, task_id):
+    """
+    批量更新多个依赖
+    
+    Args:
+        packages (list): 依赖名称列表
+        task_id (str): 任务ID
+    
+    Returns:
+        bool: 是否全部成功
+    """
+    errors = []
+
+    if packages:
+        try:
+            # 单次pip调用更新整批包，解析器也能在包之间共享工作
+            python_executable = core.get_active_python_executable()
+            cmd = [python_executable, '-m', 'pip', 'install', '--upgrade', *packages]
+            success = core.stream_process_output(cmd, task_id, f'{len(packages)} 个包')
+
+            if success:
+                bump_cache_version()
+            else:
+                # 批量模式失败时回退到逐包更新，尽量完成其余包
+                core.print_status("批量更新失败，回退到逐包更新", 'warning')
+                total = len(packages)
+                for index, pkg in enumerate(packages, 1):
+                    try:
+                        core.update_task_progress(task_id, index, f'更新 {pkg} ({index}/{total})')
+                        if not update_dependency(pkg, task_id):
+                            errors.append(f"{pkg}: 更新失败")
+                    except Exception as e:
+                        errors.append(f"{pkg}: {str(e)}")
+        except Exception as e:
+            errors.append(f"批量更新出错: {str(e)}")
+
+    # 完成任务
+    core.complete_task(task_id, errors)
+
+    # 如果有错误，则返回失败
+    return len(errors) == 0
+
+# 安装依赖
+def install_dependency(package_name):
+    """
+    安装单个依赖
+    
+    Args:
+        package_name (str): 包名称
+    
+    Returns:
+        tuple: (success, message) 元组
+    """
+    try:
+        core.print_status(f"正在安装 {package_name}...", 'start')
+        # 使用当前活动环境的Python
+        python_executable = core.get_active_python_executable()
+        
+        # 使用subprocess.run而不是check_call，这样可以捕获输出和返回码
+        result = subprocess.run(
+            [python_executable, '-m', 'pip', 'install', package_name],
+            capture_output=True,
+            text=True
+        )
+        
+        # 检查命令执行结果
+        if result.returncode == 0:
+            core.print_status(f"成功安装 {package_name}", 'success')
+            bump_cache_version()
+            return True, f'成功安装: {package_name}'
+        else:
+            # 返回pip命令的错误信息
+            error_message = result.stderr.strip() or '未知错误'
+            core.print_status(f"安装 {package_name} 失败: {error_message}", 'error')
+            return False, f'安装失败: {error_message}'
+            
+    except Exception as e:
+        core.print_status(f"处理安装请求时出错: {str(e)}", 'error')
+        return False, f'安装失败: {str(e)}'
+
+# 后台任务方式安装依赖
+def install_dependency_with_task(package_name, task_id):
+    """
+    以后台任务方式安装依赖，通过任务进度上报结果
+
+    Args:
+        package_name (str): 包名称
+        task_id (str): 任务ID
+
+    Returns:
+        bool: 是否成功
+    """
+    core.update_task_progress(task_id, 10, f'开始安装 {package_name}...')
+    success, message = install_dependency(package_name)
+    core.complete_task(task_id, [] if success else [f"{package_name}: {message}"])
+    return success
+
+# 后台任务方式卸载依赖
+def uninstall_dependency_with_task(package_name, task_id):
+    """
+    以后台任务方式卸载依赖，通过任务进度上报结果
+
+    Args:
+        package_name (str): 依赖名称
+        task_id (str): 任务ID
+
+    Returns:
+        bool: 是否成功
+    """
+    core.update_task_progress(task_id, 10, f'开始卸载 {package_name}...')
+    success, message = uninstall_dependency(package_name)
+    core.complete_task(task_id, [] if success else [f"{package_name}: {message}"])
+    return success
+
+# 安装wheel文件
+def install_whl(file_path, task_id):
+    """
+    安装wheel文件
+    
+    Args:
+        file_path (str): wheel文件路径
+        task_id (str): 任务ID
+    
+    Returns:
+        bool: 是否成功
+    """
+    file_name = os.path.basename(file_path)
+    
+    try:
+        core.update_task_progress(task_id, 10, f'准备安装 {file_name}...')
+        core.print_status(f"正在安装wheel文件: {file_name}", 'start')
+        
+        # 使用当前活动环境的Python
+        python_executable = core.get_active_python_executable()
+        
+        # 使用流式处理输出
+        cmd = [python_executable, '-m', 'pip', 'install', file_path]
+        success = core.stream_process_output(cmd, task_id, file_name)
+        
+        if not success:
+            core.print_status(f"安装 {file_name} 失败", 'error')
+            core.update_task_progress(task_id, 100, f'安装 {file_name} 失败')
+            return False
+        
+        core.print_status(f"成功安装 {file_name}", 'success')
+        core.update_task_progress(task_id, 100, f'成功安装 {file_name}')
+        bump_cache_version()
+        return True
+    except Exception as e:
+        core.print_status(f"安装 {file_name} 时发生错误: {str(e)}", 'error')
+        return False
+
+# 从内存中的requirements内容安装
+def install_requirements_from_bytes(content, task_id):
+    """
+    直接从上传的requirements内容安装，通过stdin传给pip，无需落盘
+
+    Args:
+        content (bytes): requirements.txt的文件内容
+        task_id (str): 任务ID
+
+    Returns:
+        bool: 是否成功
+    """
+    try:
+        core.update_task_progress(task_id, 0, '正在解析requirements内容...')
+
+        text = content.decode('utf-8', errors='ignore') if isinstance(content, bytes) else content
+        requirements = [line.strip() for line in text.splitlines()
+                        if line.strip() and not line.strip().startswith('#')]
+
+        if not requirements:
+            core.update_task_progress(task_id, 100, '没有找到有效的包，文件可能为空')
+            core.print_status("requirements内容为空或只包含注释", 'warning')
+            core.complete_task(task_id, [{"package": "requirements.txt", "error": "文件为空或只包含注释"}])
+            return False
+
+        core.update_task_progress(task_id, 10, f'找到 {len(requirements)} 个包需要安装')
+        core.print_status(f"找到 {len(requirements)} 个依赖需要安装", 'info')
+
+        # 使用当前活动环境的Python
+        python_executable = core.get_active_python_executable()
+
+        # pip支持 -r - 从标准输入读取requirements
+        cmd = [python_executable, '-m', 'pip', 'install', '-r', '-']
+        success = core.stream_process_output(cmd, task_id, "requirements.txt", input_data=text)
+
+        if not success:
+            core.print_status(f"安装requirements.txt失败", 'error')
+            return False
+
+        core.print_status("成功安装requirements.txt中的依赖", 'success')
+        bump_cache_version()
+        return True
+    except Exception as e:
+        core.print_status(f"处理requirements内容时出错: {str(e)}", 'error')
+        return False
+
+# 安装requirements文件
+def install_requirements(file_path, task_id):
+    """
+    安装requirements.txt文件
+    
+    Args:
+        file_path (str): requirements文件路径
+        task_id (str): 任务ID
+    
+    Returns:
+        bool: 是否成功
+    """
+    file_name = os.path.basename(file_path)
+    
+    try:
+        core.update_task_progress(task_id, 0, '正在读取requirements.txt文件...')
+        core.print_status(f"正在读取文件 {file_name}...", 'start')
+        
+        # 流式读取requirements文件，每行只strip一次，不整块读入内存
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            requirements = [s for s in (line.strip() for line in f) if s and not s.startswith('#')]
+        
+        if not requirements:
+            core.update_task_progress(task_id, 100, '没有找到有效的包，文件可能为空')
+            core.print_status(f"文件 {file_name} 为空或只包含注释", 'warning')
+            core.complete_task(task_id, [{"package": file_name, "error": "文件为空或只包含注释"}])
+            return False
+            
+        core.update_task_progress(task_id, 10, f'找到 {len(requirements)} 个包需要安装')
+        core.print_status(f"找到 {len(requirements)} 个依赖需要安装", 'info')
+        
+        # 使用当前活动环境的Python
+        python_executable = core.get_active_python_executable()
+        
+        # 使用pip直接安装requirements.txt文件，使用流式处理
+        cmd = [python_executable, '-m', 'pip', 'install', '-r', file_path]
+        success = core.stream_process_output(cmd, task_id, "requirements.txt")
+        
+        if not success:
+            core.print_status(f"安装requirements.txt失败", 'error')
+            return False
+        
+        core.print_status("成功安装requirements.txt中的依赖", 'success')
+        bump_cache_version()
+        return True
+    except Exception as e:
+        core.print_status(f"处理文件 {file_name} 时出错: {str(e)}", 'error')
+        return False
+
+# 清理PIP缓存
+def clean_pip_cache(task_id):
+    """
+    清理PIP缓存
+    
+    Args:
+        task_id (str): 任务ID
+    
+    Returns:
+        bool: 是否成功
+    """
+    try:
+        core.update_task_progress(task_id, 10, '开始清理PIP缓存...')
+        core.print_status("开始清理PIP缓存...", 'start')
+        
+        # 使用当前活动环境的Python
+        python_executable = core.get_active_python_executable()
+        
+        # 执行pip cache purge命令清理缓存
+        core.update_task_progress(task_id, 50, '正在清理PIP缓存...')
+        result = subprocess.run(
+            [python_executable, '-m', 'pip', 'cache', 'purge'],
+            capture_output=True,
+            text=True
+        )
+        
+        if result.returncode != 0:
+            core.print_status(f"清理PIP缓存失败: {result.stderr}", 'error')
+            core.update_task_progress(task_id, 100, '清理缓存失败')
+            core.complete_task(task_id, [f"清理缓存失败: {result.stderr}"])
+            return False
+        
+        core.print_status("PIP缓存清理完成", 'success')
+        core.update_task_progress(task_id, 100, '缓存清理完成')
+        core.complete_task(task_id, [])
+        return True
+    except Exception as e:
+        core.print_status(f"清理缓存出错: {str(e)}", 'error')
+        core.complete_task(task_id, [f"清理缓存出错: {str(e)}"])
+        return False
+
+def get_dependency_graph(package_name, max_depth=2, include_dev=False):
+    """
+    获取依赖关系图数据
+    
+    Args:
+        package_name (str): 包名称
+        max_depth (int): 最大依赖深度
+        include_dev (bool): 是否包括开发依赖
+        
+    Returns:
+        dict: 包含nodes和links的图形数据
+    """
+    # 初始化图形数据结构
+    graph_data = {
+        "nodes": [],
+        "links": []
+    }
+    
+    try:
+        # 检查包是否已安装
+        if not is_package_installed(package_name):
+            return {
+                "nodes": [{
+                    "id": package_name,
+                    "name": package_name,
+                    "version": "未安装",
+                    "type": "main",
+                    "description": "包未安装"
+                }],
+                "links": []
+            }
+        
+        # 获取主包信息
+        main_package_info = get_package_info(package_name)
+        if not main_package_info:
+            return {
+                "nodes": [{
+                    "id": package_name,
+                    "name": package_name,
+                    "version": "未知",
+                    "type": "main",
+                    "description": "无法获取包信息"
+                }],
+                "links": []
+            }
+        
+        # 添加主包节点
+        graph_data["nodes"].append({
+            "id": package_name,
+            "name": package_name,
+            "version": main_package_info.get("version", "未知"),
+            "type": "main",
+            "description": main_package_info.get("summary", "无描述")
+        })
+        
+        # 逐层构建依赖树
+        build_dependency_tree(
+            package_name,
+            graph_data,
+            max_depth=max_depth,
+            include_dev=include_dev
+        )
+
+        return graph_data
+        
+    except Exception as e:
+        print(f"获取依赖关系图失败: {str(e)}")
+        # 返回包含错误信息的最小图
+        return {
+            "nodes": [{
+                "id": package_name,
+                "name": package_name,
+                "version": "错误",
+                "type": "main",
+                "description": f"获取依赖关系图失败: {str(e)}"
+            }],
+            "links": []
+        }
+
+def build_dependency_tree(package_name, graph_data, max_depth=2, include_dev=False):
+    """
+    迭代BFS逐层构建依赖树
+
+    用显式队列替代递归，visited集合为局部变量，
+    并发请求不同的依赖图时互不干扰，且天然防止循环依赖
+
+    Args:
+        package_name (str): 包名称
+        graph_data (dict): 图形数据
+        max_depth (int): 最大深度
+        include_dev (bool): 是否包括开发依赖
+    """
+    visited = {package_name}
+    current_level = [package_name]
+    depth = 0
+
+    while current_level and depth < max_depth:
+        next_level = []
+        for parent in current_level:
+            # 获取包的依赖信息
+            for dep_name, dep_info in get_package_dependencies(parent).items():
+                # 跳过已处理的依赖，避免循环
+                if dep_name in visited:
+                    continue
+
+                # 检查是否需要包含开发依赖
+                if not include_dev and dep_info.get("dev_dependency", False):
+                    continue
+
+                visited.add(dep_name)
+
+                # 获取详细的包信息
+                package_info = get_package_info(dep_name)
+
+                # 确定节点类型
+                optional = dep_info.get("optional", False)
+                node_type = "optional" if optional else "direct"
+
+                # 添加节点
+                graph_data["nodes"].append({
+                    "id": dep_name,
+                    "name": dep_name,
+                    "version": package_info.get("version", "未知") if package_info else "未知",
+                    "type": node_type,
+                    "description": package_info.get("summary", "无描述") if package_info else "无描述"
+                })
+
+                # 添加链接
+                graph_data["links"].append({
+                    "source": parent,
+                    "target": dep_name,
+                    "type": "optional" if optional else "required"
+                })
+
+                next_level.append(dep_name)
+
+        current_level = next_level
+        depth += 1
+
+@functools.lru_cache(maxsize=512)
+def get_package_dependencies(package_name):
+    """
+    获取包的依赖信息
+
+    dist.requires来自METADATA文本解析，图遍历会对同一个包反复求依赖，
+    结果按包名缓存避免重复解析，安装/卸载等变更通过bump_cache_version清空
+
+    Args:
+        package_name (str): 包名称
+        
+    Returns:
+        dict: 依赖信息字典
+    """
+    dependencies = {}
+
+    try:
+        # 直接读取已解析的包元数据，免去每个节点一次pip show子进程
+        dist = distribution(package_name)
+    except PackageNotFoundError:
+        print(f"无法获取包 {package_name} 的信息: 未安装")
+        return {}
+    except Exception as e:
+        print(f"获取包 {package_name} 的依赖信息失败: {str(e)}")
+        return {}
+
+    try:
+        for req_str in dist.requires or []:
+            try:
+                req = Requirement(req_str)
+            except Exception:
+                continue
+
+            # 带extra标记的requirement是可选依赖
+            optional = bool(req.marker and 'extra' in str(req.marker))
+
+            dependencies[req.name] = {
+                "optional": optional,
+                "dev_dependency": False,  # 包元数据不区分开发依赖
+                "raw_requirement": req_str
+            }
+
+        return dependencies
+
+    except Exception as e:
+        print(f"获取包 {package_name} 的依赖信息失败: {str(e)}")
+        return {}
+
+@functools.lru_cache(maxsize=512)
+def get_package_info(package_name):
+    """
+    获取包的详细信息
+
+    图遍历会经不同路径反复查询同一批包，结果按包名缓存，
+    安装/卸载等变更通过bump_cache_version清空
+
+    Args:
+        package_name (str): 包名称
+
+    Returns:
+        dict: 包信息字典
+    """
+    try:
+        # 直接读取已解析的包元数据，微秒级完成，无需pip show子进程
+        dist = distribution(package_name)
+        metadata = dist.metadata
+        return {
+            "name": metadata['Name'] if 'Name' in metadata else package_name,
+            "version": dist.version,
+            "summary": metadata['Summary'] if 'Summary' in metadata else ''
+        }
+    except PackageNotFoundError:
+        print(f"无法获取包 {package_name} 的信息: 未安装")
+        return None
+    except Exception as e:
+        print(f"获取包 {package_name} 的信息失败: {str(e)}")
+        return None
+
+@functools.lru_cache(maxsize=512)
+def is_package_installed(package_name):
+    """
+    检查包是否已安装
+
+    结果按包名缓存，安装/卸载等变更通过bump_cache_version清空
+
+    Args:
+        package_name (str): 包名称
+
+    Returns:
+        bool: 是否已安装
+    """
+    try:
+        # 元数据查询即可确认安装状态，无需pip list子进程
+        distribution(package_name)
+        return True
+    except PackageNotFoundError:
+        return False
+    except Exception as e:
+        print(f"检查包 {package_name} 是否已安装失败: {str(e)}")
+        return False
+
+# 单包信息memo - key为(包名, 已安装版本, 解释器)，版本变化即自然失效
+_single_info_cache = {}
+_single_info_lock = threading.Lock()
+_SINGLE_INFO_TTL = 24 * 60 * 60
+
+# 获取单个依赖的详细信息
+def get_single_dependency_info(package_name, force_refresh=False):
+    """
+    获取单个依赖的详细信息，支持增量刷新
+
+    当执行单个包的操作（安装、卸载、更新）后，可以使用此函数仅刷新该包的信息，
+    而不是重新获取所有依赖的列表。
+
+    Args:
+        package_name (str): 包名
+        force_refresh (bool): 是否强制刷新PyPI版本缓存
+
+    Returns:
+        dict: 依赖信息字典，如果包不存在则返回None
+    """
+    # 获取当前激活的Python环境路径
+    python_executable = core.get_active_python_executable()
+
+    # 检查包是否已安装
+    try:
+        target = package_name.lower()
+        if _is_current_interpreter(python_executable):
+            # 当前进程环境直接查快照，零子进程
+            package_data = None
+            for name, ver in _cached_distributions():
+                if name == target:
+                    package_data = {'name': name, 'version': ver}
+                    break
+        else:
+            # 优先走常驻辅助解释器；返回None既可能是未安装也可能是通信失败，
+            # 两种情况都退回一次性子进程确认
+            package_data = _helper_request(python_executable, f'QUERY {target}')
+            if package_data is None:
+                result = subprocess.run(
+                    [python_executable, '-c', _QUERY_PACKAGE_SCRIPT, package_name],
+                    capture_output=True,
+                    text=True,
+                    encoding='utf-8'
+                )
+
+                if result.returncode != 0:
+                    core.print_status(f"获取依赖 {package_name} 信息失败: {result.stderr}", 'error')
+                    return None
+
+                # 解析脚本输出
+                package_data = _json_loads(result.stdout)
+
+        if not package_data:
+            # 包未安装
+            return None
+
+        # 设置包的其他属性
+        pkg_name = package_data['name']
+        pkg_version = package_data['version']
+
+        # 已安装版本未变时，PyPI比较和描述查询的结果可直接复用
+        memo_key = (pkg_name, pkg_version, python_executable)
+        if not force_refresh:
+            with _single_info_lock:
+                memo = _single_info_cache.get(memo_key)
+            if memo is not None and time.time() - memo[0] < _SINGLE_INFO_TTL:
+                return dict(memo[1])
+
+        is_system = pkg_name in SYSTEM_DEPENDENCIES
+        is_core = pkg_name in CORE_DEPENDENCIES
+        is_ai_model = pkg_name in AI_MODEL_DEPENDENCIES
+        is_app_required = pkg_name in APP_DEPENDENCIES
+
+        # 获取包描述 - 区分"没缓存过"和"缓存过但描述为空"，后者不再重复请求
+        description = dependency_descriptions.get(pkg_name)
+        if description is None:
+            description = ""
+            # 负缓存TTL内的包跳过请求（已知在PyPI上查不到）
+            if time.time() - _description_negative_cache.get(pkg_name, 0) >= _DESCRIPTION_NEG_TTL:
+                # 尝试从PyPI获取（同一响应也刷新了版本缓存）
+                data = _fetch_pypi_json(pkg_name)
+                if data is not None:
+                    description = data.get('info', {}).get('summary', "")
+                    dependency_descriptions[pkg_name] = description
+                    save_descriptions()
+                else:
+                    _description_negative_cache[pkg_name] = time.time()
+
+        # 获取最新版本信息，可选强制刷新
+        latest_version = ""
+        is_latest = False
+
+        try:
+            if not is_system and not is_app_required:
+                pypi_info = get_latest_version_from_pypi(pkg_name, force_refresh)
+                if pypi_info.get('version'):
+                    latest_version = pypi_info['version']
+
+                    # 版本比较：原始字符串相等时直接命中，免去标准化
+                    is_latest = (pkg_version == latest_version)
+                    if not is_latest:
+                        norm_current = normalize_version(pkg_version)
+                        norm_latest = normalize_version(latest_version)
+                        is_latest = (norm_current == norm_latest)
+
+                    if not is_latest:
+                        try:
+                            current_ver = _parse_version(pkg_version)
+                            latest_ver = _parse_version(latest_version)
+                            is_latest = (current_ver >= latest_ver)
+                        except Exception:
+                            is_latest = (pkg_version == latest_version)
+        except Exception as e:
+            core.print_status(f"获取 {pkg_name} 的最新版本信息失败: {e}", 'warning')
+            is_latest = False
+
+        # 返回完整的依赖信息
+        info = {
+            'name': pkg_name,
+            'version': pkg_version,
+            'description': description,
+            'isSystem': is_system,
+            'isCore': is_core,
+            'isAIModel': is_ai_model,
+            'isAppRequired': is_app_required,
+            'isLatest': is_latest,
+            'latestVersion': latest_version
+        }
+        with _single_info_lock:
+            # 防止长期运行时memo无界增长
+            if len(_single_info_cache) > 512:
+                _single_info_cache.clear()
+            _single_info_cache[memo_key] = (time.time(), info)
+        return dict(info)
+    except Exception as e:
+        core.print_status(f"获取依赖 {package_name} 信息失败: {e}", 'error')
+        return None